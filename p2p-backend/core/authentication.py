@@ -0,0 +1,31 @@
+import functools
+import time
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+# Validated tokens kept per process; a burst of polls from one client re-sends the same token
+VALIDATED_TOKEN_CACHE_SIZE = 4096
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that remembers tokens it has already verified, so repeat
+    requests with the same token skip the signature check and claim parsing.
+    A cached token is only trusted until its own exp claim.
+    """
+    def get_validated_token(self, raw_token):
+        token = _get_validated_token(raw_token)
+        if token['exp'] <= time.time():
+            # Expired since it was cached; validate again so the usual error is raised
+            return super().get_validated_token(raw_token)
+        return token
+
+
+@functools.lru_cache(maxsize=VALIDATED_TOKEN_CACHE_SIZE)
+def _get_validated_token(raw_token):
+    return JWTAuthentication().get_validated_token(raw_token)
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Document CachedJWTAuthentication as the same bearer scheme as JWTAuthentication"""
+    target_class = CachedJWTAuthentication
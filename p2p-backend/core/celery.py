@@ -0,0 +1,16 @@
+"""
+Celery config for core project.
+
+OCR extraction and PO document generation run as background tasks so
+they do not hold up web workers.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+app = Celery('core')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,18 @@
+import orjson
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+# Datetimes go through DRF's encoder so their format matches JSONRenderer's
+_ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer backed by orjson, which encodes straight to bytes and is
+    several times faster than the stdlib json module on large list payloads.
+    Anything orjson cannot encode natively falls back to DRF's JSONEncoder.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=encoders.JSONEncoder().default, option=_ORJSON_OPTIONS)
@@ -0,0 +1,15 @@
+import copy
+
+
+class CachedFieldsMixin:
+    """
+    Build a ModelSerializer's fields once per class and return deep copies,
+    skipping the model introspection DRF repeats for every serializer instance.
+    """
+    def get_fields(self):
+        cls = type(self)
+        template = cls.__dict__.get('_fields_template')
+        if template is None:
+            template = super().get_fields()
+            cls._fields_template = template
+        return copy.deepcopy(template)
@@ -62,14 +62,24 @@ SPECTACULAR_SETTINGS['ENUM_NAME_OVERRIDES'] = {
 # Configure REST framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        # The browsable API is only useful while developing
+        *(['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Login/register attempts are checked before any password hashing happens
+    'DEFAULT_THROTTLE_RATES': {
+        'auth': os.getenv('AUTH_THROTTLE_RATE', '20/min'),
+        'login_email': os.getenv('LOGIN_EMAIL_THROTTLE_RATE', '10/min'),
+    },
 }
 
 # JWT Settings
@@ -83,6 +93,35 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Cache Settings (shared between web and worker processes when Redis is configured)
+if os.getenv('REDIS_CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_CACHE_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Celery Settings
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+# Without a configured broker, tasks run inline so a local setup works without Redis
+CELERY_TASK_ALWAYS_EAGER = os.getenv(
+    'CELERY_TASK_ALWAYS_EAGER', 'False' if os.getenv('CELERY_BROKER_URL') else 'True'
+) == 'True'
+CELERY_TASK_ROUTES = {
+    'p2p.tasks.extract_proforma_task': {'queue': 'ocr'},
+    'p2p.tasks.validate_receipt_task': {'queue': 'ocr'},
+    'p2p.tasks.generate_po_document_task': {'queue': 'documents'},
+}
+# OCR is CPU-heavy, so workers should only reserve one task at a time
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
 # Set the custom user model
 AUTH_USER_MODEL = 'users.User'
 
@@ -135,6 +174,9 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'postgres'),
         'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
         'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        # Keep connections open between requests instead of reconnecting every time
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -179,6 +221,10 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Stream uploads (proformas and receipts up to 10MB) to temporary files instead of
+# buffering them in memory, so concurrent uploads keep a flat memory profile
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
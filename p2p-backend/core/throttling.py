@@ -0,0 +1,18 @@
+from collections.abc import Mapping
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LoginEmailRateThrottle(SimpleRateThrottle):
+    """
+    Limit login attempts per target email, whichever addresses they come from.
+    Runs before the view body, so rejected attempts never reach the password hasher.
+    """
+    scope = 'login_email'
+
+    def get_cache_key(self, request, view):
+        data = request.data
+        email = data.get('email') if isinstance(data, Mapping) else None
+        if not isinstance(email, str) or not email.strip():
+            # Nothing to key on; the request fails validation anyway
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': email.strip().lower()}
@@ -4,6 +4,7 @@ from .models import PurchaseRequest, RequestItem, Approval, PurchaseOrder
 class RequestItemInline(admin.TabularInline):
     model = RequestItem
     extra = 1
+    readonly_fields = ['total_price']  # Derived from quantity and unit price on save
 
 class ApprovalInline(admin.TabularInline):
     model = Approval
@@ -15,12 +16,12 @@ class PurchaseRequestAdmin(admin.ModelAdmin):
     list_display = ['title', 'requester', 'amount', 'status', 'created_at']
     list_filter = ['status', 'created_at']
     search_fields = ['title', 'description', 'requester__email']
-    readonly_fields = ['id', 'created_at', 'updated_at']
+    readonly_fields = ['id', 'public_id', 'created_at', 'updated_at']
     inlines = [RequestItemInline, ApprovalInline]
     
     fieldsets = (
         ('Basic Information', {
-            'fields': ('id', 'title', 'description', 'amount', 'requester', 'status')
+            'fields': ('id', 'public_id', 'title', 'description', 'amount', 'requester', 'status')
         }),
         ('Files', {
             'fields': ('proforma_invoice', 'receipt')
@@ -38,24 +39,26 @@ class PurchaseRequestAdmin(admin.ModelAdmin):
 class RequestItemAdmin(admin.ModelAdmin):
     list_display = ['item_name', 'purchase_request', 'quantity', 'unit_price', 'total_price']
     search_fields = ['item_name', 'description']
+    readonly_fields = ['total_price']  # Derived from quantity and unit price on save
 
 @admin.register(Approval)
 class ApprovalAdmin(admin.ModelAdmin):
     list_display = ['purchase_request', 'level', 'status', 'approver', 'approved_at']
     list_filter = ['level', 'status', 'approved_at']
     search_fields = ['purchase_request__title', 'approver__email']
-    readonly_fields = ['id', 'created_at']
+    readonly_fields = ['id', 'public_id', 'created_at']
 
 @admin.register(PurchaseOrder)
 class PurchaseOrderAdmin(admin.ModelAdmin):
     list_display = ['po_number', 'purchase_request', 'vendor_name', 'total_amount', 'status', 'created_at']
     list_filter = ['status', 'created_at']
     search_fields = ['po_number', 'vendor_name', 'purchase_request__title']
-    readonly_fields = ['id', 'po_number', 'created_at', 'updated_at']
+    readonly_fields = ['id', 'public_id', 'po_number', 'created_at', 'updated_at']
+    list_select_related = ['purchase_request', 'created_by']
     
     fieldsets = (
         ('Basic Information', {
-            'fields': ('id', 'po_number', 'purchase_request', 'total_amount', 'status')
+            'fields': ('id', 'public_id', 'po_number', 'purchase_request', 'total_amount', 'status')
         }),
         ('Vendor Information', {
             'fields': ('vendor_name', 'vendor_address', 'vendor_email', 'vendor_phone')
@@ -1,5 +1,48 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_migrate
+
+def enable_trigram_extension(sender, using, **kwargs):
+    """Make sure pg_trgm exists before the search indexes are created"""
+    from django.db import connections
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+def create_po_number_sequence(sender, using, **kwargs):
+    """Create the PO number sequence once, continuing after every PO numbered before it existed"""
+    from django.db import connections, transaction
+    from .models import PO_NUMBER_SEQUENCE, PurchaseOrder
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    table = PurchaseOrder._meta.db_table
+    with connection.cursor() as cursor:
+        # Nothing to seed from until the purchase order table has its sequence_no column
+        if table not in connection.introspection.table_names(cursor):
+            return
+        columns = {column.name for column in connection.introspection.get_table_description(cursor, table)}
+        if 'sequence_no' not in columns:
+            return
+        cursor.execute('SELECT to_regclass(%s)', [PO_NUMBER_SEQUENCE])
+        if cursor.fetchone()[0] is not None:
+            return
+        with transaction.atomic(using=using):
+            cursor.execute(f'CREATE SEQUENCE {PO_NUMBER_SEQUENCE}')
+            cursor.execute(
+                f"SELECT setval(%s, GREATEST(COALESCE(MAX(sequence_no), 0), "
+                f"COALESCE(MAX(CAST(substring(po_number FROM '-([0-9]+)$') AS bigint)), 0)) + 1, false) "
+                f"FROM {table}",
+                [PO_NUMBER_SEQUENCE]
+            )
 
 class P2PConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'p2p'
\ No newline at end of file
+    name = 'p2p'
+
+    def ready(self):
+        from .models import PurchaseRequest, bump_request_list_cache_version
+        pre_migrate.connect(enable_trigram_extension, sender=self)
+        post_migrate.connect(create_po_number_sequence, sender=self)
+        post_save.connect(bump_request_list_cache_version, sender=PurchaseRequest)
+        post_delete.connect(bump_request_list_cache_version, sender=PurchaseRequest)
@@ -1,8 +1,13 @@
 import os
 import re
-from io import BytesIO
+import functools
+import hashlib
+from contextlib import contextmanager
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile
 from PIL import Image
-from django.core.files.base import ContentFile
+from django.core.cache import cache
+from django.core.files.base import File
+from django.db.models import prefetch_related_objects
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -13,19 +18,57 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Regex patterns used for document data extraction (compiled once at import)
+_VENDOR_RE = re.compile(
+    r'(?:Company|Vendor|Supplier):\s*(?P<kv_val>.+)'
+    r'|^(?P<bare_val>[A-Z][A-Za-z\s&]+(?:Ltd|Inc|Corp|LLC))',
+    re.MULTILINE | re.IGNORECASE
+)
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'(?:\+?1[-.]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+_AMOUNT_RE = re.compile(r'(?:Total|Amount|Sum):\s*\$?\s*(\d+(?:,\d{3})*(?:\.\d{2})?)', re.IGNORECASE)
+
+# File extension -> document kind handled by the OCR helpers
+_EXT_MAP = {'.jpg': 'img', '.jpeg': 'img', '.png': 'img', '.pdf': 'pdf'}
+
+PDF_SPOOL_MAX_SIZE = 1024 * 1024
+
+# Tesseract runs outside the GIL, so threads are enough to use several cores
+OCR_MAX_WORKERS = min(os.cpu_count() or 1, 4)
+# How long OCR output stays in the shared cache, keyed by file content
+OCR_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+def _image_text(image_path):
+    """OCR an image, raising if OCR fails (placeholder for real OCR)"""
+    # In production, use pytesseract
+    # import pytesseract
+    # from PIL import Image
+    # image = Image.open(image_path)
+    # text = pytesseract.image_to_string(image)
+    # return text
+    
+    # Placeholder implementation
+    logger.info(f"Extracting text from image: {image_path}")
+    return ""
+
+def _pdf_text(pdf_path):
+    """OCR a PDF, raising if OCR fails (placeholder for real OCR)"""
+    # In production, use pdf2image and pytesseract
+    # from pdf2image import convert_from_path
+    # import pytesseract
+    # from concurrent.futures import ThreadPoolExecutor
+    # images = convert_from_path(pdf_path)
+    # with ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS) as pool:
+    #     return '\n'.join(pool.map(pytesseract.image_to_string, images))
+    
+    # Placeholder implementation
+    logger.info(f"Extracting text from PDF: {pdf_path}")
+    return ""
+
 def extract_text_from_image(image_path):
     """Extract text from image using OCR (placeholder for real OCR)"""
     try:
-        # In production, use pytesseract
-        # import pytesseract
-        # from PIL import Image
-        # image = Image.open(image_path)
-        # text = pytesseract.image_to_string(image)
-        # return text
-        
-        # Placeholder implementation
-        logger.info(f"Extracting text from image: {image_path}")
-        return ""
+        return _image_text(image_path)
     except Exception as e:
         logger.error(f"OCR extraction failed: {str(e)}")
         return ""
@@ -33,65 +76,109 @@ def extract_text_from_image(image_path):
 def extract_text_from_pdf(pdf_path):
     """Extract text from PDF using OCR (placeholder for real OCR)"""
     try:
-        # In production, use pdf2image and pytesseract
-        # from pdf2image import convert_from_path
-        # import pytesseract
-        # images = convert_from_path(pdf_path)
-        # text = ""
-        # for image in images:
-        #     text += pytesseract.image_to_string(image) + "\n"
-        # return text
-        
-        # Placeholder implementation
-        logger.info(f"Extracting text from PDF: {pdf_path}")
-        return ""
+        return _pdf_text(pdf_path)
     except Exception as e:
         logger.error(f"PDF extraction failed: {str(e)}")
         return ""
 
+# The raising extractors, so _ocr_file_cached can tell a failure from an empty result
+_DISPATCH = {'img': _image_text, 'pdf': _pdf_text}
+
+def _classify(file_path):
+    """Return 'img', 'pdf' or None for a file path"""
+    return _EXT_MAP.get(os.path.splitext(file_path)[1].lower())
+
+def _content_hash(file_path):
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+class _OCRFailed(Exception):
+    """Raised through _ocr_file_cached so a failed extraction is cached by neither lru_cache nor the shared cache"""
+
+@functools.lru_cache(maxsize=256)
+def _ocr_file_cached(file_path, mtime_ns, size):
+    extract = _DISPATCH.get(_classify(file_path))
+    if extract is None:
+        return None
+    
+    # Identical files (e.g. re-uploads) share OCR output across processes
+    cache_key = f'ocr:{_content_hash(file_path)}'
+    text = cache.get(cache_key)
+    if text is None:
+        try:
+            text = extract(file_path)
+        except Exception as e:
+            logger.error(f"OCR extraction failed for {file_path}: {str(e)}")
+            raise _OCRFailed(file_path) from e
+        cache.set(cache_key, text, OCR_CACHE_TIMEOUT)
+    return text
+
+def ocr_file(file_path):
+    """
+    Extract text from an image or PDF, returning None for unsupported types
+    and an empty string if OCR failed. Successful results are cached per
+    (path, mtime, size) so re-processing an unchanged file does not run OCR
+    again; failures are retried on the next call.
+    """
+    stat = os.stat(file_path)
+    try:
+        return _ocr_file_cached(file_path, stat.st_mtime_ns, stat.st_size)
+    except _OCRFailed:
+        return ""
+
+@contextmanager
+def local_file_path(field_file):
+    """
+    Yield a local filesystem path for a stored file. Storages without local
+    paths (e.g. S3) are streamed in chunks to a temporary file instead.
+    """
+    try:
+        path = field_file.path
+    except NotImplementedError:
+        path = None
+    if path is not None:
+        yield path
+        return
+    
+    # Keep the extension so the OCR helpers can classify the copy
+    with NamedTemporaryFile(suffix=os.path.splitext(field_file.name)[1]) as local_copy:
+        with field_file.open('rb') as stored:
+            for chunk in stored.chunks():
+                local_copy.write(chunk)
+        local_copy.flush()
+        yield local_copy.name
+
 def extract_proforma_data(file_path):
     """Extract vendor and item information from proforma invoice"""
     try:
-        # Determine file type
-        ext = os.path.splitext(file_path)[1].lower()
-        
-        if ext in ['.jpg', '.jpeg', '.png']:
-            text = extract_text_from_image(file_path)
-        elif ext == '.pdf':
-            text = extract_text_from_pdf(file_path)
-        else:
-            logger.warning(f"Unsupported file type: {ext}")
+        text = ocr_file(file_path)
+        if text is None:
+            logger.warning(f"Unsupported file type: {os.path.splitext(file_path)[1].lower()}")
             return {}
         
         # Extract information using regex patterns
         data = {}
         
         # Extract vendor name (looking for common patterns)
-        vendor_patterns = [
-            r'(?:Company|Vendor|Supplier):\s*(.+)',
-            r'^([A-Z][A-Za-z\s&]+(?:Ltd|Inc|Corp|LLC))',
-        ]
-        for pattern in vendor_patterns:
-            match = re.search(pattern, text, re.MULTILINE | re.IGNORECASE)
-            if match:
-                data['vendor_name'] = match.group(1).strip()
-                break
+        vendor_match = _VENDOR_RE.search(text)
+        if vendor_match:
+            data['vendor_name'] = (vendor_match.group('kv_val') or vendor_match.group('bare_val')).strip()
         
         # Extract email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, text)
+        email_match = _EMAIL_RE.search(text)
         if email_match:
             data['vendor_email'] = email_match.group(0)
         
         # Extract phone
-        phone_pattern = r'(?:\+?1[-.]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phone_match = re.search(phone_pattern, text)
+        phone_match = _PHONE_RE.search(text)
         if phone_match:
             data['vendor_phone'] = phone_match.group(0)
         
         # Extract total amount
-        amount_pattern = r'(?:Total|Amount|Sum):\s*\$?\s*(\d+(?:,\d{3})*(?:\.\d{2})?)'
-        amount_match = re.search(amount_pattern, text, re.IGNORECASE)
+        amount_match = _AMOUNT_RE.search(text)
         if amount_match:
             amount_str = amount_match.group(1).replace(',', '')
             data['total_amount'] = float(amount_str)
@@ -107,18 +194,12 @@ def validate_receipt_against_po(receipt_path, purchase_order):
     """Validate receipt data against purchase order"""
     try:
         # Extract text from receipt
-        ext = os.path.splitext(receipt_path)[1].lower()
-        
-        if ext in ['.jpg', '.jpeg', '.png']:
-            text = extract_text_from_image(receipt_path)
-        elif ext == '.pdf':
-            text = extract_text_from_pdf(receipt_path)
-        else:
+        text = ocr_file(receipt_path)
+        if text is None:
             return {'valid': False, 'message': 'Unsupported file type'}
         
         # Extract amount from receipt
-        amount_pattern = r'(?:Total|Amount|Sum):\s*\$?\s*(\d+(?:,\d{3})*(?:\.\d{2})?)'
-        amount_match = re.search(amount_pattern, text, re.IGNORECASE)
+        amount_match = _AMOUNT_RE.search(text)
         
         if amount_match:
             receipt_amount = float(amount_match.group(1).replace(',', ''))
@@ -149,48 +230,78 @@ def validate_receipt_against_po(receipt_path, purchase_order):
         logger.error(f"Receipt validation failed: {str(e)}")
         return {'valid': False, 'message': str(e)}
 
+# PO document styles (built once; reportlab styles are not mutated during layout)
+_STYLES = getSampleStyleSheet()
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#1f4788'),
+    spaceAfter=30,
+    alignment=TA_CENTER
+)
+_TOTAL_STYLE = ParagraphStyle(
+    'Total',
+    parent=_STYLES['Normal'],
+    fontSize=14,
+    textColor=colors.HexColor('#1f4788'),
+    alignment=TA_RIGHT
+)
+_PO_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.grey),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+])
+_VENDOR_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+])
+_PO_DATE_FORMAT = '%Y-%m-%d'
+_ITEMS_TABLE_HEADER = ['Item', 'Description', 'Qty', 'Unit Price', 'Total']
+_ITEMS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+])
+
 def generate_po_document(purchase_order):
     """Generate PDF document for purchase order"""
     try:
-        buffer = BytesIO()
+        # Load the request and its items up front unless the caller already did
+        prefetch_related_objects([purchase_order], 'purchase_request__items')
+        
+        # Small documents stay in memory; large ones spill over to a temp file
+        buffer = SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE)
         doc = SimpleDocTemplate(buffer, pagesize=letter)
         elements = []
         
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1f4788'),
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        
         # Title
-        title = Paragraph(f"PURCHASE ORDER", title_style)
+        title = Paragraph(f"PURCHASE ORDER", _TITLE_STYLE)
         elements.append(title)
         elements.append(Spacer(1, 0.2*inch))
         
         # PO Info
         po_data = [
             ['PO Number:', purchase_order.po_number],
-            ['Date:', purchase_order.created_at.strftime('%Y-%m-%d')],
+            ['Date:', purchase_order.created_at.strftime(_PO_DATE_FORMAT)],
             ['Status:', purchase_order.get_status_display()],
         ]
         
         po_table = Table(po_data, colWidths=[2*inch, 3*inch])
-        po_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.grey),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ]))
+        po_table.setStyle(_PO_TABLE_STYLE)
         elements.append(po_table)
         elements.append(Spacer(1, 0.3*inch))
         
         # Vendor Information
         if purchase_order.vendor_name:
-            vendor_title = Paragraph("<b>Vendor Information</b>", styles['Heading2'])
+            vendor_title = Paragraph("<b>Vendor Information</b>", _STYLES['Heading2'])
             elements.append(vendor_title)
             elements.append(Spacer(1, 0.1*inch))
             
@@ -202,62 +313,43 @@ def generate_po_document(purchase_order):
             ]
             
             vendor_table = Table(vendor_data, colWidths=[1.5*inch, 4*inch])
-            vendor_table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ]))
+            vendor_table.setStyle(_VENDOR_TABLE_STYLE)
             elements.append(vendor_table)
             elements.append(Spacer(1, 0.3*inch))
         
         # Items
-        items_title = Paragraph("<b>Items</b>", styles['Heading2'])
+        items_title = Paragraph("<b>Items</b>", _STYLES['Heading2'])
         elements.append(items_title)
         elements.append(Spacer(1, 0.1*inch))
         
-        items = purchase_order.purchase_request.items.all()
-        if items.exists():
-            item_data = [['Item', 'Description', 'Qty', 'Unit Price', 'Total']]
-            for item in items:
-                item_data.append([
+        items = list(purchase_order.purchase_request.items.all())
+        if items:
+            item_data = [_ITEMS_TABLE_HEADER] + [
+                [
                     item.item_name,
                     item.description[:50],
                     str(item.quantity),
                     f'${item.unit_price:,.2f}',
                     f'${item.total_price:,.2f}'
-                ])
+                ]
+                for item in items
+            ]
             
             item_table = Table(item_data, colWidths=[1.5*inch, 2*inch, 0.5*inch, 1*inch, 1*inch])
-            item_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
+            item_table.setStyle(_ITEMS_TABLE_STYLE)
             elements.append(item_table)
         
         # Total
         elements.append(Spacer(1, 0.3*inch))
-        total_style = ParagraphStyle(
-            'Total',
-            parent=styles['Normal'],
-            fontSize=14,
-            textColor=colors.HexColor('#1f4788'),
-            alignment=TA_RIGHT
-        )
-        total = Paragraph(f"<b>Total Amount: ${purchase_order.total_amount:,.2f}</b>", total_style)
+        total = Paragraph(f"<b>Total Amount: ${purchase_order.total_amount:,.2f}</b>", _TOTAL_STYLE)
         elements.append(total)
         
         # Notes
         if purchase_order.notes:
             elements.append(Spacer(1, 0.3*inch))
-            notes_title = Paragraph("<b>Notes</b>", styles['Heading2'])
+            notes_title = Paragraph("<b>Notes</b>", _STYLES['Heading2'])
             elements.append(notes_title)
-            notes = Paragraph(purchase_order.notes, styles['Normal'])
+            notes = Paragraph(purchase_order.notes, _STYLES['Normal'])
             elements.append(notes)
         
         # Build PDF
@@ -266,7 +358,7 @@ def generate_po_document(purchase_order):
         
         # Create file object
         filename = f'PO_{purchase_order.po_number}.pdf'
-        return ContentFile(buffer.read(), name=filename)
+        return File(buffer, name=filename)
     
     except Exception as e:
         logger.error(f"PO document generation failed: {str(e)}")
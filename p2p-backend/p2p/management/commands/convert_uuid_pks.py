@@ -0,0 +1,130 @@
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import migrations, models
+from django.db.migrations.autodetector import MigrationAutodetector
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+
+# Tables whose UUID primary key becomes a bigint identity, with the order new ids are handed out in
+UUID_PK_TABLES = {
+    'p2p_purchaserequest': 'created_at, id',
+    'p2p_requestitem': 'id',
+    'p2p_approval': 'created_at, id',
+    'p2p_purchaseorder': 'created_at, id',
+}
+
+# (table, column, referenced table) for every foreign key pointing at those primary keys
+UUID_FOREIGN_KEYS = (
+    ('p2p_requestitem', 'purchase_request_id', 'p2p_purchaserequest'),
+    ('p2p_approval', 'purchase_request_id', 'p2p_purchaserequest'),
+    ('p2p_purchaseorder', 'purchase_request_id', 'p2p_purchaserequest'),
+)
+
+MIGRATION_NAME = 'bigint_primary_keys'
+
+
+def convert_uuid_primary_keys(apps, schema_editor):
+    """
+    Swap the UUID primary keys for bigint identities in place. The old UUID is
+    kept as public_id, so API ids and upload folders stay the same.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        raise RuntimeError('UUID primary keys can only be converted in place on PostgreSQL; recreate this database instead')
+    execute = schema_editor.execute
+    # Deferred foreign key checks queued by the UPDATEs below would block the later ALTER TABLEs
+    execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+    # Keep the old key as public_id and number the rows
+    for table, order_by in UUID_PK_TABLES.items():
+        execute(f'ALTER TABLE {table} ADD COLUMN public_id uuid')
+        execute(f'UPDATE {table} SET public_id = id')
+        execute(f'ALTER TABLE {table} ALTER COLUMN public_id SET NOT NULL')
+        execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_public_id_key UNIQUE (public_id)')
+        execute(f'ALTER TABLE {table} ADD COLUMN new_id bigint')
+        execute(
+            f'UPDATE {table} SET new_id = numbered.n FROM '
+            f'(SELECT id, row_number() OVER (ORDER BY {order_by}) AS n FROM {table}) numbered '
+            f'WHERE {table}.id = numbered.id'
+        )
+
+    # Repoint foreign keys at the new numbers; ALTER ... TYPE keeps the column's indexes and unique constraints
+    with connection.cursor() as cursor:
+        for table, column, referenced_table in UUID_FOREIGN_KEYS:
+            constraints = connection.introspection.get_constraints(cursor, table)
+            for name, constraint in constraints.items():
+                if constraint['foreign_key'] and constraint['columns'] == [column]:
+                    execute(f'ALTER TABLE {table} DROP CONSTRAINT {connection.ops.quote_name(name)}')
+            execute(f'ALTER TABLE {table} ADD COLUMN {column}_new bigint')
+            execute(
+                f'UPDATE {table} SET {column}_new = referenced.new_id FROM {referenced_table} referenced '
+                f'WHERE {table}.{column} = referenced.id'
+            )
+            execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE bigint USING {column}_new')
+            execute(f'ALTER TABLE {table} DROP COLUMN {column}_new')
+
+    # Swap the primary key column itself and continue numbering after the existing rows
+    for table in UUID_PK_TABLES:
+        execute(f'ALTER TABLE {table} ALTER COLUMN id TYPE bigint USING new_id')
+        execute(f'ALTER TABLE {table} DROP COLUMN new_id')
+        execute(f'ALTER TABLE {table} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+        execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {table}")
+
+    for table, column, referenced_table in UUID_FOREIGN_KEYS:
+        execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fk FOREIGN KEY ({column}) '
+            f'REFERENCES {referenced_table} (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        'Write the migration that converts an existing database from UUID primary keys to bigint '
+        'primary keys plus a public_id UUID. Run makemigrations and migrate afterwards.'
+    )
+
+    def handle(self, *args, **options):
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        leaves = loader.graph.leaf_nodes('p2p')
+        if not leaves:
+            raise CommandError('p2p has no migrations yet; a new database gets bigint keys from makemigrations directly')
+        if len(leaves) > 1:
+            raise CommandError(f'p2p has conflicting migrations {leaves}; merge them first')
+
+        state = loader.project_state(leaves[0])
+        if not isinstance(state.models['p2p', 'purchaserequest'].fields['id'], models.UUIDField):
+            self.stdout.write('Primary keys are already bigint; nothing to do')
+            return
+
+        model_names = ('purchaserequest', 'requestitem', 'approval', 'purchaseorder')
+        migration = migrations.Migration(
+            f'{MigrationAutodetector.parse_number(leaves[0][1]) + 1:04d}_{MIGRATION_NAME}', 'p2p'
+        )
+        migration.dependencies = [leaves[0]]
+        migration.operations = [
+            migrations.SeparateDatabaseAndState(
+                database_operations=[migrations.RunPython(convert_uuid_primary_keys)],
+                state_operations=[
+                    operation
+                    for model_name in model_names
+                    for operation in (
+                        migrations.AddField(
+                            model_name=model_name,
+                            name='public_id',
+                            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                        ),
+                        migrations.AlterField(
+                            model_name=model_name,
+                            name='id',
+                            field=models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID'),
+                        ),
+                    )
+                ],
+            ),
+        ]
+
+        writer = MigrationWriter(migration)
+        with open(writer.path, 'w', encoding='utf-8') as migration_file:
+            migration_file.write(writer.as_string())
+        self.stdout.write(self.style.SUCCESS(f'Wrote {writer.path}'))
+        self.stdout.write('Next: python manage.py makemigrations p2p && python manage.py migrate')
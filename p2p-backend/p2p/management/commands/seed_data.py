@@ -1,6 +1,8 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from p2p.models import PurchaseRequest, RequestItem, Approval
+from p2p.services import ApprovalWorkflowService
 from decimal import Decimal
 
 User = get_user_model()
@@ -64,13 +66,22 @@ class Command(BaseCommand):
             },
         ]
 
+        existing_emails = set(
+            User.objects.filter(email__in=[u['email'] for u in users_data])
+            .values_list('email', flat=True)
+        )
+        
+        new_users = []
         for user_data in users_data:
             email = user_data['email']
-            if not User.objects.filter(email=email).exists():
-                User.objects.create_user(**user_data)
+            if email not in existing_emails:
+                password = user_data.pop('password')
+                new_users.append(User(password=make_password(password), **user_data))
                 self.stdout.write(f'  Created user: {email}')
             else:
                 self.stdout.write(f'  User exists: {email}')
+        
+        User.objects.bulk_create(new_users, batch_size=500, ignore_conflicts=True)
 
     def create_purchase_requests(self):
         staff_user = User.objects.get(email='staff@test.com')
@@ -119,23 +130,37 @@ class Command(BaseCommand):
             },
         ]
 
+        existing_requests = set(
+            PurchaseRequest.objects.filter(
+                title__in=[r['title'] for r in requests_data],
+                requester__in=[staff_user, staff2_user]
+            ).values_list('title', 'requester_id')
+        )
+        
+        new_requests = []
+        new_items_data = []
         for req_data in requests_data:
             items_data = req_data.pop('items')
             
-            if not PurchaseRequest.objects.filter(
-                title=req_data['title'],
-                requester=req_data['requester']
-            ).exists():
-                pr = PurchaseRequest.objects.create(**req_data)
-                
-                # Create items
-                for item_data in items_data:
-                    RequestItem.objects.create(purchase_request=pr, **item_data)
-                
-                # Create approval chain
-                from p2p.services import ApprovalWorkflowService
-                ApprovalWorkflowService.create_approval_chain(pr)
-                
-                self.stdout.write(f'  Created request: {pr.title}')
+            if (req_data['title'], req_data['requester'].id) not in existing_requests:
+                new_requests.append(PurchaseRequest(**req_data))
+                new_items_data.append(items_data)
+                self.stdout.write(f'  Created request: {req_data["title"]}')
             else:
                 self.stdout.write(f'  Request exists: {req_data["title"]}')
+        
+        PurchaseRequest.objects.bulk_create(new_requests, batch_size=500)
+        
+        # bulk_create skips RequestItem.save(), so compute totals here
+        RequestItem.objects.bulk_create([
+            RequestItem(
+                purchase_request=pr,
+                total_price=item_data['quantity'] * item_data['unit_price'],
+                **item_data
+            )
+            for pr, items_data in zip(new_requests, new_items_data)
+            for item_data in items_data
+        ], batch_size=500)
+        
+        # Create approval chains
+        ApprovalWorkflowService.create_approval_chains_bulk(new_requests)
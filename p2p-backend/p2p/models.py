@@ -1,15 +1,40 @@
-from django.db import models
+from django.db import models, connection, transaction, IntegrityError
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models import Max, Value
+from django.db.models.functions import Cast, Concat, Upper
 import uuid
 
 User = get_user_model()
 
+APPROVER_ROLES = frozenset({'approver_level_1', 'approver_level_2'})
+FINAL_REQUEST_STATUSES = frozenset({'APPROVED', 'REJECTED'})
+
+# Cache key holding the version that every cached purchase request list response is keyed by
+REQUEST_LIST_CACHE_VERSION_KEY = 'pr-list-version'
+
+def bump_request_list_cache_version(using=None, **kwargs):
+    """Invalidate all cached purchase request lists (also connected as a save/delete signal receiver)"""
+    # Bumping before the write commits would let a concurrent list cache the old rows under the
+    # new version; outside a transaction on_commit runs immediately
+    transaction.on_commit(_increment_request_list_cache_version, using=using)
+
+def _increment_request_list_cache_version():
+    cache.add(REQUEST_LIST_CACHE_VERSION_KEY, 0, timeout=None)
+    cache.incr(REQUEST_LIST_CACHE_VERSION_KEY)
+
+# Postgres sequence PO numbers are drawn from; created and seeded by p2p.apps on migrate
+PO_NUMBER_SEQUENCE = 'po_number_seq'
+# Attempts at inserting a PO before giving up on a PO number conflict (fallback numbering only)
+PO_NUMBER_ATTEMPTS = 3
+
 def upload_to_request(instance, filename):
-    return f'requests/{instance.id}/{filename}'
+    return f'requests/{instance.public_id}/{filename}'
 
 def upload_to_po(instance, filename):
-    return f'purchase_orders/{instance.id}/{filename}'
+    return f'purchase_orders/{instance.public_id}/{filename}'
 
 class PurchaseRequest(models.Model):
     STATUS_CHOICES = [
@@ -20,7 +45,7 @@ class PurchaseRequest(models.Model):
         ('REJECTED', 'Rejected'),
     ]
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    public_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     title = models.CharField(max_length=255)
     description = models.TextField()
     amount = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(0)])
@@ -29,11 +54,28 @@ class PurchaseRequest(models.Model):
     proforma_invoice = models.FileField(upload_to=upload_to_request, null=True, blank=True)
     receipt = models.FileField(upload_to=upload_to_request, null=True, blank=True)
     extracted_data = models.JSONField(null=True, blank=True)  # OCR extracted data
+    receipt_validation = models.JSONField(null=True, blank=True)  # Receipt vs PO check result
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Title and description in one column so search is a single indexed lookup
+    search_text = models.GeneratedField(
+        expression=Concat('title', Value(' '), 'description', output_field=models.TextField()),
+        output_field=models.TextField(),
+        db_persist=True
+    )
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='pr_status_created_idx'),
+            models.Index(fields=['requester', '-created_at'], name='pr_requester_created_idx'),
+            models.Index(fields=['status', 'requester'], name='pr_status_requester_idx'),
+            models.Index(fields=['-created_at', '-id'], name='pr_created_id_idx'),
+            # Trigram index matching the UPPER(col::text) LIKE form of icontains,
+            # so the list search can use an index instead of a sequential scan
+            GinIndex(OpClass(Upper(Cast('search_text', models.TextField())), name='gin_trgm_ops'),
+                     name='pr_search_text_trgm_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.status}"
@@ -48,10 +90,10 @@ class PurchaseRequest(models.Model):
 
     def can_reject(self, user):
         """Check if user can reject this request"""
-        return user.role in ['approver_level_1', 'approver_level_2'] and self.status not in ['APPROVED', 'REJECTED']
+        return user.role in APPROVER_ROLES and self.status not in FINAL_REQUEST_STATUSES
 
 class RequestItem(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    public_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     purchase_request = models.ForeignKey(PurchaseRequest, on_delete=models.CASCADE, related_name='items')
     item_name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
@@ -62,9 +104,34 @@ class RequestItem(models.Model):
     def __str__(self):
         return f"{self.item_name} x {self.quantity}"
 
+    TRACKED_FIELDS = ('purchase_request_id', 'item_name', 'description', 'quantity', 'unit_price', 'total_price')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._tracked_values()
+        return instance
+
+    def _tracked_values(self):
+        # Read from __dict__ so deferred fields are not loaded just to snapshot them
+        return {name: self.__dict__.get(name) for name in self.TRACKED_FIELDS}
+
     def save(self, *args, **kwargs):
+        # Always derived, so a total edited on its own is corrected rather than saved
         self.total_price = self.quantity * self.unit_price
+        
+        # On plain updates of a loaded row only write the columns that actually changed
+        loaded = getattr(self, '_loaded_values', None)
+        if (loaded is not None and not self._state.adding
+                and kwargs.get('update_fields') is None and not kwargs.get('force_insert')):
+            current = self._tracked_values()
+            changed = [name for name in self.TRACKED_FIELDS if current[name] != loaded[name]]
+            # An empty update_fields would skip the save and its signals entirely
+            if changed:
+                kwargs['update_fields'] = changed
+        
         super().save(*args, **kwargs)
+        self._loaded_values = self._tracked_values()
 
 class Approval(models.Model):
     LEVEL_CHOICES = [
@@ -78,7 +145,7 @@ class Approval(models.Model):
         ('REJECTED', 'Rejected'),
     ]
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    public_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     purchase_request = models.ForeignKey(PurchaseRequest, on_delete=models.CASCADE, related_name='approvals')
     level = models.CharField(max_length=10, choices=LEVEL_CHOICES)
     approver = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='approvals')
@@ -90,6 +157,9 @@ class Approval(models.Model):
     class Meta:
         ordering = ['level', 'created_at']
         unique_together = ['purchase_request', 'level']
+        indexes = [
+            models.Index(fields=['level', 'status'], name='approval_level_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.purchase_request.title} - {self.level} - {self.status}"
@@ -102,8 +172,10 @@ class PurchaseOrder(models.Model):
         ('CANCELLED', 'Cancelled'),
     ]
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    public_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     po_number = models.CharField(max_length=50, unique=True)
+    # Numeric part of po_number; null only for POs numbered before it was recorded
+    sequence_no = models.PositiveBigIntegerField(unique=True, null=True, editable=False)
     purchase_request = models.OneToOneField(PurchaseRequest, on_delete=models.CASCADE, related_name='purchase_order')
     vendor_name = models.CharField(max_length=255, blank=True)
     vendor_address = models.TextField(blank=True)
@@ -119,19 +191,40 @@ class PurchaseOrder(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='po_status_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='po_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"PO-{self.po_number}"
 
     @staticmethod
     def generate_po_number():
-        """Generate unique PO number"""
+        """Allocate the next PO number, as (sequence_no, po_number)"""
         from datetime import datetime
         date_str = datetime.now().strftime('%Y%m%d')
-        last_po = PurchaseOrder.objects.filter(po_number__startswith=f'PO-{date_str}').order_by('-po_number').first()
-        if last_po:
-            last_num = int(last_po.po_number.split('-')[-1])
-            new_num = last_num + 1
+        
+        if connection.vendor == 'postgresql':
+            # The sequence hands out numbers atomically, even across concurrent approvals
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT nextval(%s)', [PO_NUMBER_SEQUENCE])
+                sequence_no = cursor.fetchone()[0]
         else:
-            new_num = 1
-        return f'PO-{date_str}-{new_num:04d}'
\ No newline at end of file
+            # Concurrent callers can read the same maximum here; the unique sequence_no
+            # turns that into an IntegrityError, which create_numbered retries
+            sequence_no = (PurchaseOrder.objects.aggregate(last=Max('sequence_no'))['last'] or 0) + 1
+        return sequence_no, f'PO-{date_str}-{sequence_no:04d}'
+    
+    @staticmethod
+    def create_numbered(**fields):
+        """Create a purchase order under the next PO number"""
+        for attempt in range(PO_NUMBER_ATTEMPTS):
+            sequence_no, po_number = PurchaseOrder.generate_po_number()
+            try:
+                with transaction.atomic():
+                    return PurchaseOrder.objects.create(sequence_no=sequence_no, po_number=po_number, **fields)
+            except IntegrityError:
+                # A sequence never repeats a number, so only the fallback is worth retrying
+                if connection.vendor == 'postgresql' or attempt == PO_NUMBER_ATTEMPTS - 1:
+                    raise
\ No newline at end of file
@@ -1,39 +1,48 @@
 from rest_framework import permissions
 
-class IsStaff(permissions.BasePermission):
-    """Permission for staff users"""
-    def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and request.user.role == 'staff'
+# Purchase request statuses each role may view
+_VIEW_STATUS_BY_ROLE = {
+    'approver_level_1': frozenset({'PENDING', 'APPROVED_LEVEL_1', 'APPROVED_LEVEL_2', 'APPROVED', 'REJECTED'}),
+    'approver_level_2': frozenset({'APPROVED_LEVEL_1', 'APPROVED_LEVEL_2', 'APPROVED', 'REJECTED'}),
+    'finance': frozenset({'APPROVED', 'APPROVED_LEVEL_2'}),
+}
+
+# Purchase request statuses in which the requester may still edit or delete
+_MODIFIABLE_STATUSES = frozenset({'PENDING', 'REJECTED'})
+
+class HasAnyRole(permissions.BasePermission):
+    """Base permission for authenticated users holding any of the subclass's roles"""
+    roles = frozenset()
 
-class IsStaffOwner(permissions.BasePermission):
-    """Permission for staff users to access their own requests"""
     def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and request.user.role == 'staff'
-    
-    def has_object_permission(self, request, view, obj):
-        # Staff can only modify their own requests
-        return obj.requester == request.user
+        user = request.user
+        return bool(user and user.is_authenticated and user.role in self.roles)
+
+class IsStaff(HasAnyRole):
+    """Permission for staff users"""
+    roles = frozenset({'staff'})
 
-class IsApproverLevel1(permissions.BasePermission):
+class IsApproverLevel1(HasAnyRole):
     """Permission for level 1 approvers"""
-    def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and request.user.role == 'approver_level_1'
+    roles = frozenset({'approver_level_1'})
 
-class IsApproverLevel2(permissions.BasePermission):
+class IsApproverLevel2(HasAnyRole):
     """Permission for level 2 approvers"""
-    def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and request.user.role == 'approver_level_2'
+    roles = frozenset({'approver_level_2'})
 
-class IsAnyApprover(permissions.BasePermission):
+class IsAnyApprover(HasAnyRole):
     """Permission for any approver"""
-    def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and \
-               request.user.role in ['approver_level_1', 'approver_level_2']
+    roles = frozenset({'approver_level_1', 'approver_level_2'})
 
-class IsFinance(permissions.BasePermission):
+class IsFinance(HasAnyRole):
     """Permission for finance users"""
-    def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and request.user.role == 'finance'
+    roles = frozenset({'finance'})
+
+class IsStaffOwner(IsStaff):
+    """Permission for staff users to access their own requests"""
+    def has_object_permission(self, request, view, obj):
+        # Staff can only modify their own requests
+        return obj.requester == request.user
 
 class CanViewPurchaseRequest(permissions.BasePermission):
     """
@@ -44,40 +53,29 @@ class CanViewPurchaseRequest(permissions.BasePermission):
     """
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated
-    
+
     def has_object_permission(self, request, view, obj):
         user = request.user
-        
+        role = user.role
+
         # Staff can view their own requests
-        if user.role == 'staff':
+        if role == 'staff':
             return obj.requester == user
-        
-        # Approvers can view requests at their level
-        if user.role == 'approver_level_1':
-            return obj.status in ['PENDING', 'APPROVED_LEVEL_1', 'APPROVED_LEVEL_2', 'APPROVED', 'REJECTED']
-        
-        if user.role == 'approver_level_2':
-            return obj.status in ['APPROVED_LEVEL_1', 'APPROVED_LEVEL_2', 'APPROVED', 'REJECTED']
-        
-        # Finance can view approved requests
-        if user.role == 'finance':
-            return obj.status in ['APPROVED', 'APPROVED_LEVEL_2']
-        
-        return False
-
-class CanModifyPurchaseRequest(permissions.BasePermission):
+
+        # Approvers see requests at or past their level, finance sees approved ones
+        viewable_statuses = _VIEW_STATUS_BY_ROLE.get(role)
+        return viewable_statuses is not None and obj.status in viewable_statuses
+
+class CanModifyPurchaseRequest(IsStaff):
     """
     Permission to modify purchase requests:
     - Only staff can modify their own requests
     - Only if request is PENDING or REJECTED
     """
-    def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and request.user.role == 'staff'
-    
     def has_object_permission(self, request, view, obj):
         # Staff can only modify their own requests
         if obj.requester != request.user:
             return False
-        
+
         # Can only modify if PENDING or REJECTED
-        return obj.status in ['PENDING', 'REJECTED']
\ No newline at end of file
+        return obj.status in _MODIFIABLE_STATUSES
@@ -1,12 +1,36 @@
+import os
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from drf_spectacular.utils import extend_schema_field
+from core.serializers import CachedFieldsMixin
 from .models import PurchaseRequest, RequestItem, Approval, PurchaseOrder
 
 User = get_user_model()
 
+# Upload limits for proforma invoices and receipts
+MAX_UPLOAD_SIZE = 10 << 20  # 10MB
+ALLOWED_UPLOAD_EXTENSIONS = frozenset({'.pdf', '.jpg', '.jpeg', '.png'})
+_UNSUPPORTED_TYPE_MESSAGE = "File type not supported. Allowed types: .pdf, .jpg, .jpeg, .png"
+
+# Standalone fields used to format values() rows exactly like the model serializers do
+_AMOUNT_FIELD = serializers.DecimalField(max_digits=12, decimal_places=2)
+_DATETIME_FIELD = serializers.DateTimeField()
+
+def create_request_items(purchase_request, items_data):
+    """Insert all items of a request in one query"""
+    # bulk_create skips RequestItem.save(), so compute totals here
+    RequestItem.objects.bulk_create([
+        RequestItem(
+            purchase_request=purchase_request,
+            total_price=item_data['quantity'] * item_data['unit_price'],
+            **item_data
+        )
+        for item_data in items_data
+    ], batch_size=500)
+
 # Use a different name to avoid conflicts with users.serializers.UserSerializer
-class P2PUserSerializer(serializers.ModelSerializer):
+class P2PUserSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     
     @extend_schema_field(serializers.CharField)
@@ -18,13 +42,16 @@ class P2PUserSerializer(serializers.ModelSerializer):
         fields = ['id', 'email', 'first_name', 'last_name', 'full_name', 'role']
         ref_name = 'P2PUser'  # Explicit reference name for OpenAPI
 
-class RequestItemSerializer(serializers.ModelSerializer):
+class RequestItemSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+    id = serializers.UUIDField(source='public_id', read_only=True)
+    
     class Meta:
         model = RequestItem
         fields = ['id', 'item_name', 'description', 'quantity', 'unit_price', 'total_price']
         read_only_fields = ['id', 'total_price']
 
-class ApprovalSerializer(serializers.ModelSerializer):
+class ApprovalSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+    id = serializers.UUIDField(source='public_id', read_only=True)
     approver_details = P2PUserSerializer(source='approver', read_only=True)
     level_display = serializers.CharField(source='get_level_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -35,12 +62,14 @@ class ApprovalSerializer(serializers.ModelSerializer):
                   'approver', 'approver_details', 'comments', 'approved_at', 'created_at']
         read_only_fields = ['id', 'approver', 'approved_at', 'created_at']
 
-class PurchaseRequestListSerializer(serializers.ModelSerializer):
+class PurchaseRequestListSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Lightweight serializer for list views"""
+    id = serializers.UUIDField(source='public_id', read_only=True)
     requester_details = P2PUserSerializer(source='requester', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
-    has_proforma = serializers.SerializerMethodField()
-    has_receipt = serializers.SerializerMethodField()
+    # Annotated by PurchaseRequestViewSet.get_queryset
+    has_proforma = serializers.BooleanField(read_only=True)
+    has_receipt = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = PurchaseRequest
@@ -49,16 +78,51 @@ class PurchaseRequestListSerializer(serializers.ModelSerializer):
                   'created_at', 'updated_at']
         read_only_fields = ['id', 'requester', 'created_at', 'updated_at']
     
-    @extend_schema_field(serializers.BooleanField)
-    def get_has_proforma(self, obj):
-        return bool(obj.proforma_invoice)
+    # Columns read by to_representation_from_values()
+    VALUES_FIELDS = (
+        'public_id', 'title', 'description', 'amount', 'status', 'requester_id',
+        'requester__email', 'requester__first_name', 'requester__last_name', 'requester__role',
+        'has_proforma', 'has_receipt', 'created_at', 'updated_at',
+    )
     
-    @extend_schema_field(serializers.BooleanField)
-    def get_has_receipt(self, obj):
-        return bool(obj.receipt)
+    @staticmethod
+    def to_representation_from_values(rows):
+        """
+        Build the same payload as serializing model instances, from queryset.values(*VALUES_FIELDS)
+        rows, skipping per-row model and serializer field overhead on hot list endpoints
+        """
+        status_labels = dict(PurchaseRequest.STATUS_CHOICES)
+        to_amount = _AMOUNT_FIELD.to_representation
+        to_datetime = _DATETIME_FIELD.to_representation
+        data = []
+        for row in rows:
+            first_name, last_name = row['requester__first_name'], row['requester__last_name']
+            data.append({
+                'id': str(row['public_id']),
+                'title': row['title'],
+                'description': row['description'],
+                'amount': to_amount(row['amount']),
+                'status': row['status'],
+                'status_display': status_labels.get(row['status'], row['status']),
+                'requester': row['requester_id'],
+                'requester_details': {
+                    'id': row['requester_id'],
+                    'email': row['requester__email'],
+                    'first_name': first_name,
+                    'last_name': last_name,
+                    'full_name': f"{first_name} {last_name}".strip(),
+                    'role': row['requester__role'],
+                },
+                'has_proforma': row['has_proforma'],
+                'has_receipt': row['has_receipt'],
+                'created_at': to_datetime(row['created_at']),
+                'updated_at': to_datetime(row['updated_at']),
+            })
+        return data
 
-class PurchaseRequestDetailSerializer(serializers.ModelSerializer):
+class PurchaseRequestDetailSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Detailed serializer with nested relationships"""
+    id = serializers.UUIDField(source='public_id', read_only=True)
     requester_details = P2PUserSerializer(source='requester', read_only=True)
     items = RequestItemSerializer(many=True, required=False)
     approvals = ApprovalSerializer(many=True, read_only=True)
@@ -68,16 +132,16 @@ class PurchaseRequestDetailSerializer(serializers.ModelSerializer):
         model = PurchaseRequest
         fields = ['id', 'title', 'description', 'amount', 'status', 'status_display',
                   'requester', 'requester_details', 'proforma_invoice', 'receipt',
-                  'extracted_data', 'items', 'approvals', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'requester', 'status', 'extracted_data', 'created_at', 'updated_at']
+                  'extracted_data', 'receipt_validation', 'items', 'approvals', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'requester', 'status', 'extracted_data', 'receipt_validation',
+                            'created_at', 'updated_at']
     
     def create(self, validated_data):
         items_data = validated_data.pop('items', [])
         purchase_request = PurchaseRequest.objects.create(**validated_data)
         
         # Create items
-        for item_data in items_data:
-            RequestItem.objects.create(purchase_request=purchase_request, **item_data)
+        create_request_items(purchase_request, items_data)
         
         # Create approval chain
         from .services import ApprovalWorkflowService
@@ -98,8 +162,7 @@ class PurchaseRequestDetailSerializer(serializers.ModelSerializer):
             # Delete existing items
             instance.items.all().delete()
             # Create new items
-            for item_data in items_data:
-                RequestItem.objects.create(purchase_request=instance, **item_data)
+            create_request_items(instance, items_data)
         
         return instance
 
@@ -120,22 +183,16 @@ class PurchaseRequestCreateSerializer(serializers.ModelSerializer):
         )
         
         # Create items
-        for item_data in items_data:
-            RequestItem.objects.create(purchase_request=purchase_request, **item_data)
+        create_request_items(purchase_request, items_data)
         
         # Create approval chain
         from .services import ApprovalWorkflowService
         ApprovalWorkflowService.create_approval_chain(purchase_request)
         
-        # Extract data from proforma if uploaded
+        # Extract data from proforma in the background if uploaded
         if purchase_request.proforma_invoice:
-            from .document_processor import extract_proforma_data
-            try:
-                extracted_data = extract_proforma_data(purchase_request.proforma_invoice.path)
-                purchase_request.extracted_data = extracted_data
-                purchase_request.save()
-            except Exception:
-                pass  # Continue even if extraction fails
+            from .tasks import extract_proforma_task
+            transaction.on_commit(lambda: extract_proforma_task.delay(purchase_request.pk), robust=True)
         
         return purchase_request
 
@@ -143,11 +200,45 @@ class ApprovalActionSerializer(serializers.Serializer):
     """Serializer for approval/rejection actions"""
     comments = serializers.CharField(required=False, allow_blank=True)
 
-class PurchaseOrderSerializer(serializers.ModelSerializer):
-    purchase_request_details = PurchaseRequestListSerializer(source='purchase_request', read_only=True)
-    created_by_details = P2PUserSerializer(source='created_by', read_only=True)
+class PurchaseOrderSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+    id = serializers.UUIDField(source='public_id', read_only=True)
+    purchase_request = serializers.SlugRelatedField(slug_field='public_id', read_only=True)
+    purchase_request_details = serializers.SerializerMethodField()
+    created_by_details = serializers.SerializerMethodField()
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     
+    # Flat summaries built from select_related rows instead of nested serializers
+    @extend_schema_field({
+        'type': 'object',
+        'properties': {
+            'id': {'type': 'string', 'format': 'uuid'},
+            'title': {'type': 'string'},
+            'status': {'type': 'string'},
+        }
+    })
+    def get_purchase_request_details(self, obj):
+        purchase_request = obj.purchase_request
+        return {
+            'id': str(purchase_request.public_id),
+            'title': purchase_request.title,
+            'status': purchase_request.status,
+        }
+    
+    @extend_schema_field({
+        'type': 'object',
+        'nullable': True,
+        'properties': {
+            'id': {'type': 'integer'},
+            'email': {'type': 'string'},
+            'full_name': {'type': 'string'},
+        }
+    })
+    def get_created_by_details(self, obj):
+        user = obj.created_by
+        if user is None:
+            return None
+        return {'id': user.id, 'email': user.email, 'full_name': user.full_name}
+    
     class Meta:
         model = PurchaseOrder
         fields = ['id', 'po_number', 'purchase_request', 'purchase_request_details',
@@ -163,15 +254,12 @@ class FileUploadSerializer(serializers.Serializer):
     
     def validate_file(self, value):
         # Validate file size (max 10MB)
-        if value.size > 10 * 1024 * 1024:
+        if value.size > MAX_UPLOAD_SIZE:
             raise serializers.ValidationError("File size cannot exceed 10MB")
         
         # Validate file extension
-        allowed_extensions = ['.pdf', '.jpg', '.jpeg', '.png']
-        ext = value.name.split('.')[-1].lower()
-        if f'.{ext}' not in allowed_extensions:
-            raise serializers.ValidationError(
-                f"File type not supported. Allowed types: {', '.join(allowed_extensions)}"
-            )
+        ext = os.path.splitext(value.name)[1].lower()
+        if ext not in ALLOWED_UPLOAD_EXTENSIONS:
+            raise serializers.ValidationError(_UNSUPPORTED_TYPE_MESSAGE)
         
         return value
\ No newline at end of file
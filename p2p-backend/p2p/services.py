@@ -1,11 +1,24 @@
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from .models import PurchaseRequest, Approval, PurchaseOrder
-from .document_processor import generate_po_document
+from .tasks import generate_po_document_task
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Approver role -> (approval level, request status after approving at that level)
+APPROVAL_LEVEL_BY_ROLE = {
+    'approver_level_1': ('LEVEL_1', 'APPROVED_LEVEL_1'),
+    'approver_level_2': ('LEVEL_2', 'APPROVED_LEVEL_2'),
+}
+
+# Approvals for a request in level order, with approvers joined rather than prefetched separately
+APPROVALS_WITH_APPROVER = Prefetch('approvals', queryset=Approval.objects.select_related('approver').order_by('level'))
+
+# PurchaseOrder vendor columns filled from a request's extracted proforma data
+VENDOR_FIELDS = ('vendor_name', 'vendor_address', 'vendor_email', 'vendor_phone')
+
 class ApprovalWorkflowService:
     """Service for handling purchase request approval workflow"""
     
@@ -13,123 +26,126 @@ class ApprovalWorkflowService:
     @transaction.atomic
     def create_approval_chain(purchase_request):
         """Create approval records for a new purchase request"""
-        Approval.objects.create(
-            purchase_request=purchase_request,
-            level='LEVEL_1',
-            status='PENDING'
-        )
-        Approval.objects.create(
-            purchase_request=purchase_request,
-            level='LEVEL_2',
-            status='PENDING'
+        Approval.objects.bulk_create([
+            Approval(purchase_request=purchase_request, level='LEVEL_1', status='PENDING'),
+            Approval(purchase_request=purchase_request, level='LEVEL_2', status='PENDING'),
+        ])
+    
+    @staticmethod
+    @transaction.atomic
+    def create_approval_chains_bulk(purchase_requests):
+        """Create approval records for many purchase requests in one INSERT"""
+        Approval.objects.bulk_create(
+            [
+                Approval(purchase_request=purchase_request, level=level, status='PENDING')
+                for purchase_request in purchase_requests
+                for level in ('LEVEL_1', 'LEVEL_2')
+            ],
+            batch_size=500,
+            ignore_conflicts=True
         )
     
+    @staticmethod
+    def with_detail_relations(purchase_request):
+        """Attach the items and approvals PurchaseRequestDetailSerializer reads to an already loaded request"""
+        prefetch_related_objects([purchase_request], 'items', APPROVALS_WITH_APPROVER)
+        return purchase_request
+    
     @staticmethod
     @transaction.atomic
     def approve_request(purchase_request, user, comments=''):
         """Approve a purchase request at the appropriate level"""
+        # Lock the row so concurrent approvers cannot both pass the status check
+        purchase_request = PurchaseRequest.objects.select_related('requester').select_for_update(
+            of=('self',)
+        ).get(pk=purchase_request.pk)
         if not purchase_request.can_approve(user):
             raise ValueError('You are not authorized to approve this request at this stage')
         
         # Determine approval level
-        if user.role == 'approver_level_1':
-            approval_level = 'LEVEL_1'
-            new_status = 'APPROVED_LEVEL_1'
-        elif user.role == 'approver_level_2':
-            approval_level = 'LEVEL_2'
-            new_status = 'APPROVED_LEVEL_2'
-        else:
+        try:
+            approval_level, new_status = APPROVAL_LEVEL_BY_ROLE[user.role]
+        except KeyError:
             raise ValueError('Invalid approver role')
         
-        # Update approval record
-        approval = Approval.objects.get(
+        # Update approval record in a single UPDATE
+        updated = Approval.objects.filter(
             purchase_request=purchase_request,
             level=approval_level
+        ).update(
+            status='APPROVED',
+            approver=user,
+            comments=comments,
+            approved_at=timezone.now()
         )
-        approval.status = 'APPROVED'
-        approval.approver = user
-        approval.comments = comments
-        approval.approved_at = timezone.now()
-        approval.save()
-        
-        # Update purchase request status
-        purchase_request.status = new_status
-        purchase_request.save()
+        if not updated:
+            raise ValueError('Approval record not found for this request')
         
-        # Check if all approvals are complete
+        # Level 2 completes the chain; finalize_approval writes the final status itself
         if new_status == 'APPROVED_LEVEL_2':
             ApprovalWorkflowService.finalize_approval(purchase_request, user)
+        else:
+            purchase_request.status = new_status
+            purchase_request.save(update_fields=['status', 'updated_at'])
         
-        return purchase_request
+        return ApprovalWorkflowService.with_detail_relations(purchase_request)
     
     @staticmethod
     @transaction.atomic
     def reject_request(purchase_request, user, comments=''):
         """Reject a purchase request"""
+        # Lock the row so concurrent approvers cannot both pass the status check
+        purchase_request = PurchaseRequest.objects.select_related('requester').select_for_update(
+            of=('self',)
+        ).get(pk=purchase_request.pk)
         if not purchase_request.can_reject(user):
             raise ValueError('You are not authorized to reject this request')
         
         # Determine approval level
-        if user.role == 'approver_level_1':
-            approval_level = 'LEVEL_1'
-        elif user.role == 'approver_level_2':
-            approval_level = 'LEVEL_2'
-        else:
+        try:
+            approval_level, _ = APPROVAL_LEVEL_BY_ROLE[user.role]
+        except KeyError:
             raise ValueError('Invalid approver role')
         
-        # Update approval record
-        approval = Approval.objects.get(
+        # Update approval record in a single UPDATE
+        updated = Approval.objects.filter(
             purchase_request=purchase_request,
             level=approval_level
+        ).update(
+            status='REJECTED',
+            approver=user,
+            comments=comments,
+            approved_at=timezone.now()
         )
-        approval.status = 'REJECTED'
-        approval.approver = user
-        approval.comments = comments
-        approval.approved_at = timezone.now()
-        approval.save()
+        if not updated:
+            raise ValueError('Approval record not found for this request')
         
         # Update purchase request status
         purchase_request.status = 'REJECTED'
-        purchase_request.save()
+        purchase_request.save(update_fields=['status', 'updated_at'])
         
-        return purchase_request
+        return ApprovalWorkflowService.with_detail_relations(purchase_request)
     
     @staticmethod
     @transaction.atomic
     def finalize_approval(purchase_request, user):
         """Finalize approval and generate PO"""
         purchase_request.status = 'APPROVED'
-        purchase_request.save()
-        
-        # Generate PO number
-        po_number = PurchaseOrder.generate_po_number()
+        purchase_request.save(update_fields=['status', 'updated_at'])
         
         # Extract vendor info from extracted_data if available
-        vendor_info = {}
-        if purchase_request.extracted_data:
-            vendor_info = {
-                'vendor_name': purchase_request.extracted_data.get('vendor_name', ''),
-                'vendor_address': purchase_request.extracted_data.get('vendor_address', ''),
-                'vendor_email': purchase_request.extracted_data.get('vendor_email', ''),
-                'vendor_phone': purchase_request.extracted_data.get('vendor_phone', ''),
-            }
+        extracted_data = purchase_request.extracted_data or {}
+        vendor_info = {field: extracted_data.get(field, '') for field in VENDOR_FIELDS}
         
-        # Create Purchase Order
-        po = PurchaseOrder.objects.create(
-            po_number=po_number,
+        # Create Purchase Order under the next PO number
+        po = PurchaseOrder.create_numbered(
             purchase_request=purchase_request,
             total_amount=purchase_request.amount,
             created_by=user,
             **vendor_info
         )
         
-        # Generate PO document
-        try:
-            po_document = generate_po_document(po)
-            po.document = po_document
-            po.save()
-            logger.info(f"Generated PO document for {po.po_number}")
-        except Exception as e:
-            logger.error(f"Failed to generate PO document: {str(e)}")
+        # Generate PO document in the background once the PO is committed
+        transaction.on_commit(lambda: generate_po_document_task.delay(po.pk), robust=True)
         
         return po
@@ -0,0 +1,62 @@
+from celery import shared_task
+from django.utils import timezone
+from .models import PurchaseRequest, PurchaseOrder, bump_request_list_cache_version
+from .document_processor import (
+    extract_proforma_data, generate_po_document, local_file_path, validate_receipt_against_po
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def extract_proforma_task(purchase_request_id):
+    """Run OCR on a request's proforma invoice and store the extracted data"""
+    # The request may have been deleted before the worker picked the task up
+    purchase_request = PurchaseRequest.objects.filter(pk=purchase_request_id).first()
+    if purchase_request is None or not purchase_request.proforma_invoice:
+        return
+    
+    proforma_name = purchase_request.proforma_invoice.name
+    with local_file_path(purchase_request.proforma_invoice) as proforma_path:
+        extracted_data = extract_proforma_data(proforma_path)
+    # Only store the result if the proforma was not replaced while OCR was running
+    PurchaseRequest.objects.filter(pk=purchase_request_id, proforma_invoice=proforma_name).update(
+        extracted_data=extracted_data,
+        updated_at=timezone.now()
+    )
+    # update() bypasses post_save, and the list payload includes updated_at
+    bump_request_list_cache_version()
+    logger.info(f"Extracted data from proforma: {extracted_data}")
+
+@shared_task
+def validate_receipt_task(purchase_request_id):
+    """Check an uploaded receipt against the request's purchase order and store the result"""
+    purchase_request = PurchaseRequest.objects.select_related('purchase_order').filter(pk=purchase_request_id).first()
+    if purchase_request is None or not purchase_request.receipt or not hasattr(purchase_request, 'purchase_order'):
+        return
+    
+    receipt_name = purchase_request.receipt.name
+    with local_file_path(purchase_request.receipt) as receipt_path:
+        validation_result = validate_receipt_against_po(receipt_path, purchase_request.purchase_order)
+    # Only store the result if the receipt was not replaced while validation was running
+    PurchaseRequest.objects.filter(pk=purchase_request_id, receipt=receipt_name).update(
+        receipt_validation=validation_result,
+        updated_at=timezone.now()
+    )
+    # update() bypasses post_save, and the list payload includes updated_at
+    bump_request_list_cache_version()
+    logger.info(f"Receipt validation result: {validation_result}")
+
+@shared_task
+def generate_po_document_task(purchase_order_id):
+    """Render the PDF document for a purchase order"""
+    po = PurchaseOrder.objects.select_related('purchase_request').filter(pk=purchase_order_id).first()
+    if po is None:
+        return
+    
+    try:
+        po.document = generate_po_document(po)
+        po.save(update_fields=['document'])
+        logger.info(f"Generated PO document for {po.po_number}")
+    except Exception as e:
+        logger.error(f"Failed to generate PO document: {str(e)}")
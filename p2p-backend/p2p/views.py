@@ -1,12 +1,19 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from django.db import transaction
+from django.db.models import Q, BooleanField, Count, Exists, ExpressionWrapper, Max, OuterRef
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample, extend_schema_view
 from drf_spectacular.types import OpenApiTypes
-from .models import PurchaseRequest, RequestItem, Approval, PurchaseOrder
+from .models import PurchaseRequest, RequestItem, Approval, PurchaseOrder, REQUEST_LIST_CACHE_VERSION_KEY
 from .serializers import (
     PurchaseRequestListSerializer, PurchaseRequestDetailSerializer,
     PurchaseRequestCreateSerializer, RequestItemSerializer,
@@ -17,16 +24,165 @@ from .permissions import (
     IsStaff, IsStaffOwner, IsAnyApprover,
     IsFinance, CanViewPurchaseRequest, CanModifyPurchaseRequest
 )
-from .services import ApprovalWorkflowService
-from .document_processor import extract_proforma_data, validate_receipt_against_po
+from .services import ApprovalWorkflowService, APPROVALS_WITH_APPROVER
+from .tasks import extract_proforma_task, validate_receipt_task
+import functools
+import hashlib
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Valid PurchaseRequest statuses for filtering
+_PR_STATUSES = frozenset(value for value, _ in PurchaseRequest.STATUS_CHOICES)
+
+# Valid PurchaseOrder statuses for filtering and update_status, and the same list for error messages
+_PO_STATUSES = frozenset(value for value, _ in PurchaseOrder.STATUS_CHOICES)
+_PO_STATUSES_DISPLAY = ', '.join(value for value, _ in PurchaseOrder.STATUS_CHOICES)
+
+# Role -> filter applied to that role's purchase request queryset, as (user, queryset) -> queryset
+LIST_FILTER_BY_ROLE = {
+    'staff': lambda user, queryset: queryset.filter(requester=user),  # Staff see only their own requests
+    'approver_level_1': lambda user, queryset: queryset.filter(status='PENDING'),  # Level 1 approvers see PENDING requests
+    'approver_level_2': lambda user, queryset: queryset.filter(status='APPROVED_LEVEL_1'),  # Level 2 approvers see APPROVED_LEVEL_1 requests
+    'finance': lambda user, queryset: queryset.filter(status__in=('APPROVED', 'APPROVED_LEVEL_2')),  # Finance sees approved requests
+}
+
+# Columns PurchaseRequestListSerializer reads, including the nested requester summary
+LIST_ONLY_FIELDS = (
+    'id', 'public_id', 'title', 'description', 'amount', 'status', 'created_at', 'updated_at',
+    'requester__id', 'requester__email', 'requester__first_name', 'requester__last_name', 'requester__role',
+)
+
+# Permission instances per PurchaseRequestViewSet action. DRF permissions are
+# stateless, so they are built once instead of on every request.
+_DEFAULT_REQUEST_PERMISSIONS = [IsAuthenticated(), CanViewPurchaseRequest()]
+_REQUEST_PERMISSIONS = {
+    'create': [IsAuthenticated(), IsStaff()],
+    'update': [IsAuthenticated(), CanModifyPurchaseRequest()],
+    'partial_update': [IsAuthenticated(), CanModifyPurchaseRequest()],
+    'destroy': [IsAuthenticated(), CanModifyPurchaseRequest()],
+    'approve': [IsAuthenticated(), IsAnyApprover()],
+    'reject': [IsAuthenticated(), IsAnyApprover()],
+    'upload_proforma': [IsAuthenticated()],
+    'upload_receipt': [IsAuthenticated()],
+    # Role checks for the polled lists run here, before etag_list can answer 304
+    'my_requests': [IsAuthenticated(), IsStaff()],
+    'pending': [IsAuthenticated(), IsAnyApprover()],
+}
+
+def etag_list(view_method):
+    """Answer repeated list polls with 304 Not Modified while the visible rows are unchanged"""
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        etag = self.get_list_etag(self.filter_queryset(self.get_queryset()))
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
+
+# How long a list response is reused. Request saves bump the cache version once they commit; this bounds
+# staleness from everything else: writes that never bump it (e.g. a requester renaming themselves) and,
+# without a shared Redis cache, bumps made in another process's local-memory cache
+LIST_CACHE_TIMEOUT = 15
+
+def cache_list(view_method):
+    """Serve repeated list polls from a short-lived cache shared by users who see the same rows"""
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        user = request.user
+        # Only staff lists depend on who is asking; every other role sees the same rows
+        scope = f"{user.role}:{user.pk}" if user.role == 'staff' else user.role
+        version = cache.get(REQUEST_LIST_CACHE_VERSION_KEY, 0)
+        key_source = f"{version}:{scope}:{request.get_full_path()}"
+        cache_key = f"list-response:{hashlib.md5(key_source.encode()).hexdigest()}"
+        
+        cached = cache.get(cache_key)
+        if cached is None:
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(cache_key, (response['ETag'], response.data), LIST_CACHE_TIMEOUT)
+        else:
+            etag, data = cached
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+            else:
+                response = Response(data, headers={'ETag': etag, 'Cache-Control': 'private, no-cache'})
+        patch_vary_headers(response, ('Authorization',))
+        return response
+    return wrapper
+
+# How long a list's total row count is reused for pages other than the first
+COUNT_CACHE_TIMEOUT = 300
+
+class CachedCountPaginator(Paginator):
+    """Paginator that reuses a cached COUNT(*) instead of running it for every page"""
+    def __init__(self, *args, count_cache_key=None, refresh_count=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_key = count_cache_key
+        self.refresh_count = refresh_count
+    
+    @cached_property
+    def count(self):
+        if self.count_cache_key is None:
+            return super().count
+        
+        count = None if self.refresh_count else cache.get(self.count_cache_key)
+        if count is None:
+            count = super().count
+            cache.set(self.count_cache_key, count, COUNT_CACHE_TIMEOUT)
+        return count
+
+class KeysetPagination(CursorPagination):
+    """Seek pagination on (created_at, id); page cost stays flat however deep the client scrolls"""
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
 class StandardPagination(PageNumberPagination):
+    """
+    Page-number pagination by default. Passing ?cursor= (empty for the first page)
+    switches to KeysetPagination, which skips COUNT(*) and OFFSET scans.
+    """
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+    keyset = None
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        
+        # The count only depends on who is asking and how the list is filtered, not on the page;
+        # page 1 always recounts so the first screen of a list stays exact
+        params = sorted(
+            (key, value) for key, value in request.query_params.lists()
+            if key not in (self.page_query_param, self.page_size_query_param)
+        )
+        key_source = f"{request.path}:{request.user.pk}:{request.user.role}:{params}"
+        self.django_paginator_class = functools.partial(
+            CachedCountPaginator,
+            count_cache_key=f"list-count:{hashlib.md5(key_source.encode()).hexdigest()}",
+            refresh_count=request.query_params.get(self.page_query_param, '1') in ('1', 'last')
+        )
+        return super().paginate_queryset(queryset, request, view)
+    
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+    
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            parameter for parameter in KeysetPagination().get_schema_operation_parameters(view)
+            if parameter['name'] == KeysetPagination.cursor_query_param
+        ]
 
 @extend_schema_view(
     list=extend_schema(
@@ -140,7 +296,9 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
     Approvers: View pending requests, approve/reject
     Finance: View approved requests, upload receipts
     """
-    queryset = PurchaseRequest.objects.all().select_related('requester').prefetch_related('items', 'approvals')
+    queryset = PurchaseRequest.objects.all().select_related('requester').prefetch_related('items', APPROVALS_WITH_APPROVER)
+    lookup_field = 'public_id'
+    lookup_url_kwarg = 'pk'
     pagination_class = StandardPagination
     
     def get_serializer_class(self):
@@ -151,48 +309,87 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         return PurchaseRequestDetailSerializer
     
     def get_permissions(self):
-        if self.action == 'create':
-            return [IsAuthenticated(), IsStaff()]
-        elif self.action in ['update', 'partial_update', 'destroy']:
-            return [IsAuthenticated(), CanModifyPurchaseRequest()]
-        elif self.action in ['approve', 'reject']:
-            return [IsAuthenticated(), IsAnyApprover()]
-        elif self.action in ['upload_proforma', 'upload_receipt']:
-            return [IsAuthenticated()]
-        return [IsAuthenticated(), CanViewPurchaseRequest()]
+        return _REQUEST_PERMISSIONS.get(self.action, _DEFAULT_REQUEST_PERMISSIONS)
     
     def get_queryset(self):
         user = self.request.user
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().annotate(
+            has_proforma=ExpressionWrapper(
+                Q(proforma_invoice__isnull=False) & ~Q(proforma_invoice=''),
+                output_field=BooleanField()
+            ),
+            has_receipt=ExpressionWrapper(
+                Q(receipt__isnull=False) & ~Q(receipt=''),
+                output_field=BooleanField()
+            ),
+        )
         
         # Filter based on user role
-        if user.role == 'staff':
-            # Staff can only see their own requests
-            queryset = queryset.filter(requester=user)
-        elif user.role == 'approver_level_1':
-            # Level 1 approvers see PENDING requests
-            queryset = queryset.filter(status='PENDING')
-        elif user.role == 'approver_level_2':
-            # Level 2 approvers see APPROVED_LEVEL_1 requests
-            queryset = queryset.filter(status='APPROVED_LEVEL_1')
-        elif user.role == 'finance':
-            # Finance sees approved requests
-            queryset = queryset.filter(status__in=['APPROVED', 'APPROVED_LEVEL_2'])
+        role_filter = LIST_FILTER_BY_ROLE.get(user.role)
+        if role_filter is not None:
+            queryset = role_filter(user, queryset)
+        
+        # The list serializer only exposes summary columns (file presence is annotated above)
+        # and no nested items or approvals
+        if self.action == 'list':
+            queryset = queryset.only(*LIST_ONLY_FIELDS).prefetch_related(None)
+        elif self.action in ('approve', 'reject'):
+            # The service re-reads the row under a lock and prefetches for the response itself
+            queryset = queryset.prefetch_related(None)
+        elif self.action == 'upload_receipt':
+            # Join the PO so checking for it does not cost a separate query
+            queryset = queryset.select_related('purchase_order')
         
         # Apply filters
         status_filter = self.request.query_params.get('status')
         if status_filter:
-            queryset = queryset.filter(status=status_filter)
+            # An unknown status can never match, so skip the database entirely
+            if status_filter in _PR_STATUSES:
+                queryset = queryset.filter(status=status_filter)
+            else:
+                queryset = queryset.none()
         
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | 
-                Q(description__icontains=search)
-            )
+            queryset = queryset.filter(search_text__icontains=search)
         
         return queryset
     
+    def get_list_etag(self, queryset):
+        """ETag that changes whenever a request in the user's filtered list is added, removed or updated"""
+        summary = queryset.order_by().aggregate(last_updated=Max('updated_at'), total=Count('pk'))
+        user = self.request.user
+        key = f"{user.pk}:{user.role}:{self.request.get_full_path()}:{summary['total']}:{summary['last_updated']}"
+        return f'"{hashlib.md5(key.encode()).hexdigest()}"'
+    
+    @cache_list
+    @etag_list
+    def list(self, request, *args, **kwargs):
+        # Fast path: plain values() rows instead of model instances run through the serializer
+        queryset = self.filter_queryset(self.get_queryset()).values(*PurchaseRequestListSerializer.VALUES_FIELDS)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(PurchaseRequestListSerializer.to_representation_from_values(page))
+        
+        return Response(PurchaseRequestListSerializer.to_representation_from_values(queryset))
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Get request details, answering repeat polls with 304 Not Modified"""
+        # Permissions and the ETag only need a narrow row; the full payload is built on a miss
+        summary = get_object_or_404(
+            self.get_queryset().prefetch_related(None).only('id', 'public_id', 'status', 'updated_at', 'requester__id'),
+            public_id=kwargs[self.lookup_url_kwarg]
+        )
+        self.check_object_permissions(request, summary)
+        etag = f'"pr-{summary.public_id}-{summary.updated_at.timestamp()}"'
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        response = super().retrieve(request, *args, **kwargs)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    
     def create(self, request, *args, **kwargs):
         """Create a new purchase request"""
         serializer = self.get_serializer(data=request.data)
@@ -274,12 +471,11 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         
         if serializer.is_valid():
             try:
-                ApprovalWorkflowService.approve_request(
+                purchase_request = ApprovalWorkflowService.approve_request(
                     purchase_request,
                     request.user,
                     serializer.validated_data.get('comments', '')
                 )
-                purchase_request.refresh_from_db()
                 return Response({
                     'message': 'Purchase request approved successfully',
                     'data': PurchaseRequestDetailSerializer(purchase_request).data
@@ -329,12 +525,11 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         
         if serializer.is_valid():
             try:
-                ApprovalWorkflowService.reject_request(
+                purchase_request = ApprovalWorkflowService.reject_request(
                     purchase_request,
                     request.user,
                     serializer.validated_data.get('comments', '')
                 )
-                purchase_request.refresh_from_db()
                 return Response({
                     'message': 'Purchase request rejected successfully',
                     'data': PurchaseRequestDetailSerializer(purchase_request).data
@@ -364,7 +559,7 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
             }
         },
         responses={
-            200: {
+            202: {
                 'type': 'object',
                 'properties': {
                     'message': {'type': 'string'},
@@ -402,21 +597,16 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         serializer = FileUploadSerializer(data=request.data)
         if serializer.is_valid():
             purchase_request.proforma_invoice = serializer.validated_data['file']
-            purchase_request.save()
+            purchase_request.extracted_data = None
+            purchase_request.save(update_fields=['proforma_invoice', 'extracted_data', 'updated_at'])
             
-            # Extract data from proforma
-            try:
-                extracted_data = extract_proforma_data(purchase_request.proforma_invoice.path)
-                purchase_request.extracted_data = extracted_data
-                purchase_request.save()
-                logger.info(f"Extracted data from proforma: {extracted_data}")
-            except Exception as e:
-                logger.error(f"Failed to extract proforma data: {str(e)}")
+            # Extract data from proforma in the background
+            transaction.on_commit(lambda: extract_proforma_task.delay(purchase_request.pk), robust=True)
             
             return Response({
-                'message': 'Proforma invoice uploaded successfully',
+                'message': 'Proforma invoice uploaded successfully, data extraction in progress',
                 'data': PurchaseRequestDetailSerializer(purchase_request).data
-            }, status=status.HTTP_200_OK)
+            }, status=status.HTTP_202_ACCEPTED)
         return Response({
             'message': 'File upload failed',
             'errors': serializer.errors
@@ -441,8 +631,14 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
                 'type': 'object',
                 'properties': {
                     'message': {'type': 'string'},
-                    'data': PurchaseRequestDetailSerializer,
-                    'receipt_validation': {'type': 'object'}
+                    'data': PurchaseRequestDetailSerializer
+                }
+            },
+            202: {
+                'type': 'object',
+                'properties': {
+                    'message': {'type': 'string'},
+                    'data': PurchaseRequestDetailSerializer
                 }
             },
             400: {
@@ -482,28 +678,21 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         serializer = FileUploadSerializer(data=request.data)
         if serializer.is_valid():
             purchase_request.receipt = serializer.validated_data['file']
-            purchase_request.save()
+            purchase_request.receipt_validation = None
+            purchase_request.save(update_fields=['receipt', 'receipt_validation', 'updated_at'])
             
-            # Validate receipt against PO if it exists
-            validation_result = None
+            # Validate receipt against PO in the background if it exists
             if hasattr(purchase_request, 'purchase_order'):
-                try:
-                    validation_result = validate_receipt_against_po(
-                        purchase_request.receipt.path,
-                        purchase_request.purchase_order
-                    )
-                    logger.info(f"Receipt validation result: {validation_result}")
-                except Exception as e:
-                    logger.error(f"Failed to validate receipt: {str(e)}")
+                transaction.on_commit(lambda: validate_receipt_task.delay(purchase_request.pk), robust=True)
+                return Response({
+                    'message': 'Receipt uploaded successfully, validation in progress',
+                    'data': PurchaseRequestDetailSerializer(purchase_request).data
+                }, status=status.HTTP_202_ACCEPTED)
             
-            response_data = {
+            return Response({
                 'message': 'Receipt uploaded successfully',
                 'data': PurchaseRequestDetailSerializer(purchase_request).data
-            }
-            if validation_result:
-                response_data['receipt_validation'] = validation_result
-            
-            return Response(response_data, status=status.HTTP_200_OK)
+            }, status=status.HTTP_200_OK)
         return Response({
             'message': 'File upload failed',
             'errors': serializer.errors
@@ -523,21 +712,15 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
             403: {
                 'type': 'object',
                 'properties': {
-                    'message': {'type': 'string'},
-                    'error': {'type': 'string'}
+                    'detail': {'type': 'string'}
                 }
             }
         }
     )
     @action(detail=False, methods=['get'])
+    @etag_list
     def my_requests(self, request):
         """Get current user's requests (for staff)"""
-        if request.user.role != 'staff':
-            return Response({
-                'message': 'Access denied',
-                'error': 'This endpoint is only for staff users'
-            }, status=status.HTTP_403_FORBIDDEN)
-        
         queryset = self.get_queryset()
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -547,7 +730,7 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response({
             'message': 'Requests retrieved successfully',
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         }, status=status.HTTP_200_OK)
     
@@ -555,7 +738,8 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         description="Get pending purchase requests for approval (approvers only)",
         responses={200: PurchaseRequestListSerializer(many=True)}
     )
-    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsAnyApprover])
+    @action(detail=False, methods=['get'])
+    @etag_list
     def pending(self, request):
         """Get pending requests for approvers"""
         queryset = self.get_queryset()
@@ -591,6 +775,8 @@ class PurchaseOrderViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = PurchaseOrder.objects.all().select_related('purchase_request', 'created_by')
     serializer_class = PurchaseOrderSerializer
     pagination_class = StandardPagination
+    lookup_field = 'public_id'
+    lookup_url_kwarg = 'pk'
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
@@ -604,16 +790,20 @@ class PurchaseOrderViewSet(viewsets.ReadOnlyModelViewSet):
             # Finance can see all POs
             pass
         else:
-            # Approvers can see POs for requests they approved
-            queryset = queryset.filter(
-                purchase_request__approvals__approver=user,
-                purchase_request__approvals__status='APPROVED'
-            ).distinct()
+            # Approvers can see POs for requests they approved (semi-join, no DISTINCT needed)
+            queryset = queryset.filter(Exists(Approval.objects.filter(
+                purchase_request=OuterRef('purchase_request'),
+                approver=user,
+                status='APPROVED'
+            )))
         
         # Apply filters
         status_filter = self.request.query_params.get('status')
         if status_filter:
-            queryset = queryset.filter(status=status_filter)
+            if status_filter in _PO_STATUSES:
+                queryset = queryset.filter(status=status_filter)
+            else:
+                queryset = queryset.none()
         
         return queryset
     
@@ -662,10 +852,10 @@ class PurchaseOrderViewSet(viewsets.ReadOnlyModelViewSet):
         po = self.get_object()
         new_status = request.data.get('status')
         
-        if new_status not in dict(PurchaseOrder.STATUS_CHOICES).keys():
+        if new_status not in _PO_STATUSES:
             return Response({
                 'message': 'Invalid status',
-                'error': f'Status must be one of: {", ".join(dict(PurchaseOrder.STATUS_CHOICES).keys())}'
+                'error': f'Status must be one of: {_PO_STATUSES_DISPLAY}'
             }, status=status.HTTP_400_BAD_REQUEST)
         
         if request.user.role != 'finance':
@@ -675,7 +865,7 @@ class PurchaseOrderViewSet(viewsets.ReadOnlyModelViewSet):
             }, status=status.HTTP_403_FORBIDDEN)
         
         po.status = new_status
-        po.save()
+        po.save(update_fields=['status', 'updated_at'])
         
         return Response({
             'message': 'Purchase order status updated successfully',
@@ -4,25 +4,112 @@ Comprehensive endpoint testing script for P2P Backend
 Tests all 20 endpoints with standardized response validation
 """
 
+import atexit
+import base64
 import requests
 import json
+import orjson
+import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from requests.adapters import HTTPAdapter
 
 BASE_URL = 'http://localhost:8000'
 
+def decode_json_once(response, *args, **kwargs):
+    """Make response.json() parse the body once with orjson; each test reads it several times"""
+    decoded = []
+    def json_body(**kwargs):
+        if not decoded:
+            decoded.append(orjson.loads(response.content))
+        return decoded[0]
+    response.json = json_body
+
+# --load N: after the endpoint tests, create N purchase requests concurrently and report latencies
+LOAD_REQUESTS = int(sys.argv[sys.argv.index('--load') + 1]) if '--load' in sys.argv else 0
+
+# One keep-alive connection pool for the whole run instead of a new connection per call;
+# sized so the load test's threads never wait for a free connection
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=max(LOAD_REQUESTS, 20)))
+session.headers['Content-Type'] = 'application/json'
+session.hooks['response'].append(decode_json_once)
+# Every URL here ends in '/', so an APPEND_SLASH redirect means a wrong path - fail instead of paying the extra round-trip
+session.max_redirects = 0
+
+def run_parallel(calls, max_workers=8):
+    """Start independent calls together; returns their futures in call order"""
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return [pool.submit(call) for call in calls]
+
+# --reuse-tokens: keep access tokens between runs, per server and email, so re-runs skip the
+# password hashing of a login. Off by default so a normal run always exercises login
+REUSE_TOKENS = '--reuse-tokens' in sys.argv
+TOKEN_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.p2p_test_tokens.json')
+
+def read_token_file():
+    try:
+        with open(TOKEN_CACHE_PATH, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+def load_token_cache():
+    return read_token_file().get(BASE_URL, {}) if REUSE_TOKENS else {}
+
+def save_token_cache():
+    if not REUSE_TOKENS:
+        return
+    caches = read_token_file()
+    caches[BASE_URL] = token_cache
+    with open(TOKEN_CACHE_PATH, 'wb') as f:
+        f.write(orjson.dumps(caches))
+
+def remember_token(email, token):
+    """Cache an access token together with its expiry from the JWT payload"""
+    payload = token.split('.')[1]
+    claims = orjson.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    token_cache[email] = {'access': token, 'exp': claims['exp']}
+    save_token_cache()
+    return token
+
+def login(email, password):
+    """Return an access token, reusing a cached one while the server still accepts it"""
+    cached = token_cache.get(email)
+    if cached and cached['exp'] > time.time() + 60:
+        response = session.get(f'{BASE_URL}/api/auth/me/', headers={'Authorization': f'Bearer {cached["access"]}'})
+        if response.status_code == 200:
+            return cached['access']
+    
+    response = session.post(f'{BASE_URL}/api/auth/login/', json={'email': email, 'password': password})
+    if response.status_code != 200:
+        return None
+    return remember_token(email, response.json().get('access'))
+
+token_cache = load_token_cache()
+
 def print_section(title):
     print('\n' + '='*70)
     print(f'  {title}')
     print('='*70)
 
 def print_test(number, description):
-    print(f'\n[TEST {number}] {description}')
+    global current_test
+    current_test = f'[TEST {number}] {description}'
+    print(f'\n{current_test}')
     print('-'*70)
 
 def print_response(status_code, response_data):
     print(f'Status Code: {status_code}')
     print(f'Response: {json.dumps(response_data, indent=2)}')
 
+def print_error(error):
+    """Report a failed check and remember it for the exit status"""
+    print(f'✗ Error: {error}')
+    failures.append(f'{current_test}: {error}')
+
 def check_message_field(response_data, test_name):
     """Verify response has standardized message field"""
     if 'message' in response_data:
@@ -32,8 +119,27 @@ def check_message_field(response_data, test_name):
         print(f"⚠ Warning: No 'message' field in response")
         return False
 
+# Failures a check reports and moves past: transport errors and bodies that are not JSON.
+# Anything else is a bug in this script and should stop it
+REQUEST_ERRORS = (requests.RequestException, ValueError)
+
+# Recorded responses for offline re-runs: --replay serves matching calls from the cassette
+# and records any new ones, --record throws the cassette away and records from scratch
+CASSETTE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'p2p_smoke.yaml')
+cassette = None
+if '--replay' in sys.argv or '--record' in sys.argv:
+    import vcr
+    if '--record' in sys.argv and os.path.exists(CASSETTE_PATH):
+        os.remove(CASSETTE_PATH)
+    cassette = vcr.use_cassette(CASSETTE_PATH, record_mode='new_episodes', match_on=['method', 'path', 'body'])
+    cassette.__enter__()
+    # Runs on every exit, including the early sys.exit(1) paths, so recorded calls are always saved
+    atexit.register(cassette.__exit__, None, None, None)
+
 # Store tokens and IDs
 tokens = {}
+failures = []
+current_test = None
 pr_id = None
 po_id = None
 
@@ -45,117 +151,126 @@ print_section('P2P BACKEND - COMPREHENSIVE ENDPOINT TESTING')
 
 print_section('PART 1: AUTHENTICATION & USER MANAGEMENT')
 
+# Tests 1-4 register unrelated accounts, so send all four registrations at once
+registration_data = [
+    {
+        'email': 'staff.user@test.com',
+        'password': 'StaffPass123!',
+        'password2': 'StaffPass123!',
+        'first_name': 'Staff',
+        'last_name': 'User',
+        'role': 'staff'
+    },
+    {
+        'email': 'approver.level1@test.com',
+        'password': 'Approver1Pass123!',
+        'password2': 'Approver1Pass123!',
+        'first_name': 'Approver',
+        'last_name': 'One',
+        'role': 'approver_level_1'
+    },
+    {
+        'email': 'approver.level2@test.com',
+        'password': 'Approver2Pass123!',
+        'password2': 'Approver2Pass123!',
+        'first_name': 'Approver',
+        'last_name': 'Two',
+        'role': 'approver_level_2'
+    },
+    {
+        'email': 'finance.user@test.com',
+        'password': 'FinancePass123!',
+        'password2': 'FinancePass123!',
+        'first_name': 'Finance',
+        'last_name': 'User',
+        'role': 'finance'
+    },
+]
+# Encoded once with orjson and posted as raw bytes (the session sends the JSON Content-Type)
+registration_payloads = [orjson.dumps(data) for data in registration_data]
+registrations = run_parallel([
+    partial(session.post, f'{BASE_URL}/api/auth/register/', data=payload) for payload in registration_payloads
+])
+
 # Test 1: Register Staff User
 print_test(1, 'POST /api/auth/register/ - Register Staff User')
-register_data = {
-    'email': 'staff.user@test.com',
-    'password': 'StaffPass123!',
-    'password2': 'StaffPass123!',
-    'first_name': 'Staff',
-    'last_name': 'User',
-    'role': 'staff'
-}
 try:
-    response = requests.post(f'{BASE_URL}/api/auth/register/', json=register_data)
+    response = registrations[0].result()
     print_response(response.status_code, response.json())
     if response.status_code == 201:
-        tokens['staff'] = response.json().get('access')
+        tokens['staff'] = remember_token('staff.user@test.com', response.json().get('access'))
         check_message_field(response.json(), 'Registration')
         print('✓ Staff user registered successfully')
     else:
         # Try login if already exists
-        login_response = requests.post(f'{BASE_URL}/api/auth/login/', 
-                                      json={'email': 'staff.user@test.com', 'password': 'StaffPass123!'})
-        if login_response.status_code == 200:
-            tokens['staff'] = login_response.json().get('access')
+        token = login('staff.user@test.com', 'StaffPass123!')
+        if token:
+            tokens['staff'] = token
             print('✓ Using existing Staff account')
         else:
-            print('✗ Registration and login failed')
+            print_error('Registration and login failed')
             sys.exit(1)
-except Exception as e:
-    print(f'✗ Error: {e}')
+except requests.exceptions.ConnectionError:
+    # The first call doubles as the liveness check, so there is no separate health probe
+    print_error(f'Server not running at {BASE_URL} - start it with: python manage.py runserver')
+    sys.exit(1)
+except REQUEST_ERRORS as e:
+    print_error(e)
     sys.exit(1)
 
 # Test 2: Register Approver Level 1
 print_test(2, 'POST /api/auth/register/ - Register Approver Level 1')
-register_data = {
-    'email': 'approver.level1@test.com',
-    'password': 'Approver1Pass123!',
-    'password2': 'Approver1Pass123!',
-    'first_name': 'Approver',
-    'last_name': 'One',
-    'role': 'approver_level_1'
-}
 try:
-    response = requests.post(f'{BASE_URL}/api/auth/register/', json=register_data)
+    response = registrations[1].result()
     print_response(response.status_code, response.json())
     if response.status_code == 201:
-        tokens['approver1'] = response.json().get('access')
+        tokens['approver1'] = remember_token('approver.level1@test.com', response.json().get('access'))
         check_message_field(response.json(), 'Registration')
         print('✓ Approver Level 1 registered successfully')
     else:
         # Try login if already exists
-        login_response = requests.post(f'{BASE_URL}/api/auth/login/', 
-                                      json={'email': 'approver.level1@test.com', 'password': 'Approver1Pass123!'})
-        if login_response.status_code == 200:
-            tokens['approver1'] = login_response.json().get('access')
+        token = login('approver.level1@test.com', 'Approver1Pass123!')
+        if token:
+            tokens['approver1'] = token
             print('✓ Using existing Approver Level 1 account')
-except Exception as e:
-    print(f'✗ Error: {e}')
+except REQUEST_ERRORS as e:
+    print_error(e)
 
 # Test 3: Register Approver Level 2
 print_test(3, 'POST /api/auth/register/ - Register Approver Level 2')
-register_data = {
-    'email': 'approver.level2@test.com',
-    'password': 'Approver2Pass123!',
-    'password2': 'Approver2Pass123!',
-    'first_name': 'Approver',
-    'last_name': 'Two',
-    'role': 'approver_level_2'
-}
 try:
-    response = requests.post(f'{BASE_URL}/api/auth/register/', json=register_data)
+    response = registrations[2].result()
     print_response(response.status_code, response.json())
     if response.status_code == 201:
-        tokens['approver2'] = response.json().get('access')
+        tokens['approver2'] = remember_token('approver.level2@test.com', response.json().get('access'))
         check_message_field(response.json(), 'Registration')
         print('✓ Approver Level 2 registered successfully')
     else:
         # Try login if already exists
-        login_response = requests.post(f'{BASE_URL}/api/auth/login/', 
-                                      json={'email': 'approver.level2@test.com', 'password': 'Approver2Pass123!'})
-        if login_response.status_code == 200:
-            tokens['approver2'] = login_response.json().get('access')
+        token = login('approver.level2@test.com', 'Approver2Pass123!')
+        if token:
+            tokens['approver2'] = token
             print('✓ Using existing Approver Level 2 account')
-except Exception as e:
-    print(f'✗ Error: {e}')
+except REQUEST_ERRORS as e:
+    print_error(e)
 
 # Test 4: Register Finance User
 print_test(4, 'POST /api/auth/register/ - Register Finance User')
-register_data = {
-    'email': 'finance.user@test.com',
-    'password': 'FinancePass123!',
-    'password2': 'FinancePass123!',
-    'first_name': 'Finance',
-    'last_name': 'User',
-    'role': 'finance'
-}
 try:
-    response = requests.post(f'{BASE_URL}/api/auth/register/', json=register_data)
+    response = registrations[3].result()
     print_response(response.status_code, response.json())
     if response.status_code == 201:
-        tokens['finance'] = response.json().get('access')
+        tokens['finance'] = remember_token('finance.user@test.com', response.json().get('access'))
         check_message_field(response.json(), 'Registration')
         print('✓ Finance user registered successfully')
     else:
         # Try login if already exists
-        login_response = requests.post(f'{BASE_URL}/api/auth/login/', 
-                                      json={'email': 'finance.user@test.com', 'password': 'FinancePass123!'})
-        if login_response.status_code == 200:
-            tokens['finance'] = login_response.json().get('access')
+        token = login('finance.user@test.com', 'FinancePass123!')
+        if token:
+            tokens['finance'] = token
             print('✓ Using existing Finance account')
-except Exception as e:
-    print(f'✗ Error: {e}')
+except REQUEST_ERRORS as e:
+    print_error(e)
 
 # Test 5: Login
 print_test(5, 'POST /api/auth/login/ - Login Staff User')
@@ -164,34 +279,45 @@ login_data = {
     'password': 'StaffPass123!'
 }
 try:
-    response = requests.post(f'{BASE_URL}/api/auth/login/', json=login_data)
+    response = session.post(f'{BASE_URL}/api/auth/login/', json=login_data)
     print_response(response.status_code, response.json())
     if response.status_code == 200:
         check_message_field(response.json(), 'Login')
+        # The body is filled from a template, so check the tokens came through as JWT strings
+        for key in ('refresh', 'access'):
+            value = response.json().get(key)
+            if not isinstance(value, str) or value.count('.') != 2:
+                print_error(f'{key} is not a JWT string: {value!r}')
         print('✓ Login successful')
-except Exception as e:
-    print(f'✗ Error: {e}')
+except REQUEST_ERRORS as e:
+    print_error(e)
+
+session.headers['Authorization'] = f'Bearer {tokens["staff"]}'
+# Tests 6-7 are independent reads
+current_user, user_list = run_parallel([
+    partial(session.get, f'{BASE_URL}/api/auth/me/'),
+    partial(session.get, f'{BASE_URL}/api/auth/'),
+])
 
 # Test 6: Get Current User
 print_test(6, 'GET /api/auth/me/ - Get Current User')
-headers = {'Authorization': f'Bearer {tokens["staff"]}'}
 try:
-    response = requests.get(f'{BASE_URL}/api/auth/me/', headers=headers)
+    response = current_user.result()
     print_response(response.status_code, response.json())
     if response.status_code == 200:
         print('✓ Get current user successful')
-except Exception as e:
-    print(f'✗ Error: {e}')
+except REQUEST_ERRORS as e:
+    print_error(e)
 
 # Test 7: List All Users
 print_test(7, 'GET /api/auth/ - List All Users')
 try:
-    response = requests.get(f'{BASE_URL}/api/auth/', headers=headers)
+    response = user_list.result()
     print_response(response.status_code, response.json())
     if response.status_code == 200:
         print(f'✓ Retrieved {len(response.json())} users')
-except Exception as e:
-    print(f'✗ Error: {e}')
+except REQUEST_ERRORS as e:
+    print_error(e)
 
 # ============================================================================
 # PURCHASE REQUEST ENDPOINTS (8-13)
@@ -220,8 +346,9 @@ pr_data = {
         }
     ]
 }
+pr_payload = orjson.dumps(pr_data)
 try:
-    response = requests.post(f'{BASE_URL}/api/p2p/requests/', json=pr_data, headers=headers)
+    response = session.post(f'{BASE_URL}/api/p2p/requests/', data=pr_payload)
     print_response(response.status_code, response.json())
     if response.status_code == 201:
         data = response.json().get('data', response.json())
@@ -230,36 +357,42 @@ try:
         print(f'✓ Purchase request created with ID: {pr_id}')
         if not pr_id:
             # Fallback: Get ID from list
-            list_response = requests.get(f'{BASE_URL}/api/p2p/requests/', headers=headers)
+            list_response = session.get(f'{BASE_URL}/api/p2p/requests/')
             if list_response.status_code == 200:
                 results = list_response.json().get('results', list_response.json())
                 if isinstance(results, list) and len(results) > 0:
                     pr_id = results[0].get('id')
                     print(f'→ Retrieved PR ID from list: {pr_id}')
-except Exception as e:
-    print(f'✗ Error: {e}')
+except REQUEST_ERRORS as e:
+    print_error(e)
     sys.exit(1)
 
+# Tests 9-10 only read the request created above
+request_list, request_detail = run_parallel([
+    partial(session.get, f'{BASE_URL}/api/p2p/requests/'),
+    partial(session.get, f'{BASE_URL}/api/p2p/requests/{pr_id}/'),
+])
+
 # Test 9: List Purchase Requests
 print_test(9, 'GET /api/p2p/requests/ - List All Purchase Requests')
 try:
-    response = requests.get(f'{BASE_URL}/api/p2p/requests/', headers=headers)
+    response = request_list.result()
     print_response(response.status_code, response.json())
     if response.status_code == 200:
         count = len(response.json()) if isinstance(response.json(), list) else response.json().get('count', 0)
         print(f'✓ Retrieved {count} purchase requests')
-except Exception as e:
-    print(f'✗ Error: {e}')
+except REQUEST_ERRORS as e:
+    print_error(e)
 
 # Test 10: Get Single Purchase Request
 print_test(10, f'GET /api/p2p/requests/{pr_id}/ - Get Purchase Request Details')
 try:
-    response = requests.get(f'{BASE_URL}/api/p2p/requests/{pr_id}/', headers=headers)
+    response = request_detail.result()
     print_response(response.status_code, response.json())
     if response.status_code == 200:
         print('✓ Purchase request retrieved successfully')
-except Exception as e:
-    print(f'✗ Error: {e}')
+except REQUEST_ERRORS as e:
+    print_error(e)
 
 # Test 11: Update Purchase Request
 print_test(11, f'PATCH /api/p2p/requests/{pr_id}/ - Update Purchase Request')
@@ -268,18 +401,18 @@ update_data = {
     'description': 'Updated description with urgent priority'
 }
 try:
-    response = requests.patch(f'{BASE_URL}/api/p2p/requests/{pr_id}/', json=update_data, headers=headers)
+    response = session.patch(f'{BASE_URL}/api/p2p/requests/{pr_id}/', json=update_data)
     print_response(response.status_code, response.json())
     if response.status_code == 200:
         check_message_field(response.json(), 'Update PR')
         print('✓ Purchase request updated successfully')
-except Exception as e:
-    print(f'✗ Error: {e}')
+except REQUEST_ERRORS as e:
+    print_error(e)
 
 # Test 12: My Requests
 print_test(12, 'GET /api/p2p/requests/my_requests/ - Get My Requests')
 try:
-    response = requests.get(f'{BASE_URL}/api/p2p/requests/my_requests/', headers=headers)
+    response = session.get(f'{BASE_URL}/api/p2p/requests/my_requests/')
     print_response(response.status_code, response.json())
     if response.status_code == 200:
         data = response.json()
@@ -289,19 +422,19 @@ try:
         else:
             count = len(data) if isinstance(data, list) else 0
         print(f'✓ Retrieved {count} of my requests')
-except Exception as e:
-    print(f'✗ Error: {e}')
+except REQUEST_ERRORS as e:
+    print_error(e)
 
 # Test 13: Submit for Approval
 print_test(13, f'POST /api/p2p/requests/{pr_id}/submit/ - Submit for Approval')
 try:
-    response = requests.post(f'{BASE_URL}/api/p2p/requests/{pr_id}/submit/', headers=headers)
+    response = session.post(f'{BASE_URL}/api/p2p/requests/{pr_id}/submit/')
     print_response(response.status_code, response.json())
     if response.status_code == 200:
         check_message_field(response.json(), 'Submit')
         print('✓ Purchase request submitted for approval')
-except Exception as e:
-    print(f'✗ Error: {e}')
+except REQUEST_ERRORS as e:
+    print_error(e)
 
 # ============================================================================
 # APPROVAL WORKFLOW ENDPOINTS (14-15)
@@ -312,24 +445,24 @@ print_section('PART 3: APPROVAL WORKFLOW')
 # Test 14: Approve by Level 1
 print_test(14, f'POST /api/p2p/requests/{pr_id}/approve/ - Approve by Level 1')
 if 'approver1' in tokens:
-    headers_approver1 = {'Authorization': f'Bearer {tokens["approver1"]}'}
+    session.headers['Authorization'] = f'Bearer {tokens["approver1"]}'
     try:
-        response = requests.post(f'{BASE_URL}/api/p2p/requests/{pr_id}/approve/', headers=headers_approver1)
+        response = session.post(f'{BASE_URL}/api/p2p/requests/{pr_id}/approve/')
         print_response(response.status_code, response.json())
         if response.status_code == 200:
             check_message_field(response.json(), 'Approve L1')
             print('✓ Level 1 approval successful')
-    except Exception as e:
-        print(f'✗ Error: {e}')
+    except REQUEST_ERRORS as e:
+        print_error(e)
 else:
     print('⚠ Skipping - No approver1 token available')
 
 # Test 15: Approve by Level 2
 print_test(15, f'POST /api/p2p/requests/{pr_id}/approve/ - Approve by Level 2')
 if 'approver2' in tokens:
-    headers_approver2 = {'Authorization': f'Bearer {tokens["approver2"]}'}
+    session.headers['Authorization'] = f'Bearer {tokens["approver2"]}'
     try:
-        response = requests.post(f'{BASE_URL}/api/p2p/requests/{pr_id}/approve/', headers=headers_approver2)
+        response = session.post(f'{BASE_URL}/api/p2p/requests/{pr_id}/approve/')
         print_response(response.status_code, response.json())
         if response.status_code == 200:
             check_message_field(response.json(), 'Approve L2')
@@ -339,8 +472,8 @@ if 'approver2' in tokens:
                 print(f'✓ Level 2 approval successful - PO created: {po_id}')
             else:
                 print('✓ Level 2 approval successful')
-    except Exception as e:
-        print(f'✗ Error: {e}')
+    except REQUEST_ERRORS as e:
+        print_error(e)
 else:
     print('⚠ Skipping - No approver2 token available')
 
@@ -353,9 +486,9 @@ print_section('PART 4: PURCHASE ORDER MANAGEMENT')
 # Test 16: List Purchase Orders
 print_test(16, 'GET /api/p2p/orders/ - List All Purchase Orders')
 if 'finance' in tokens:
-    headers_finance = {'Authorization': f'Bearer {tokens["finance"]}'}
+    session.headers['Authorization'] = f'Bearer {tokens["finance"]}'
     try:
-        response = requests.get(f'{BASE_URL}/api/p2p/orders/', headers=headers_finance)
+        response = session.get(f'{BASE_URL}/api/p2p/orders/')
         print_response(response.status_code, response.json())
         if response.status_code == 200:
             orders = response.json()
@@ -369,8 +502,8 @@ if 'finance' in tokens:
                 print(f'✓ Retrieved {len(orders)} purchase orders')
             else:
                 print('✓ Retrieved purchase orders (none found)')
-    except Exception as e:
-        print(f'✗ Error: {e}')
+    except REQUEST_ERRORS as e:
+        print_error(e)
 else:
     print('⚠ Skipping - No finance token available')
 
@@ -379,12 +512,12 @@ if po_id:
     print_test(17, f'GET /api/p2p/orders/{po_id}/ - Get Purchase Order Details')
     if 'finance' in tokens:
         try:
-            response = requests.get(f'{BASE_URL}/api/p2p/orders/{po_id}/', headers=headers_finance)
+            response = session.get(f'{BASE_URL}/api/p2p/orders/{po_id}/')
             print_response(response.status_code, response.json())
             if response.status_code == 200:
                 print('✓ Purchase order retrieved successfully')
-        except Exception as e:
-            print(f'✗ Error: {e}')
+        except REQUEST_ERRORS as e:
+            print_error(e)
 
     # Test 18: Upload Proforma Invoice
     print_test(18, f'POST /api/p2p/orders/{po_id}/upload_proforma/ - Upload Proforma')
@@ -394,28 +527,28 @@ if po_id:
     }
     if 'finance' in tokens:
         try:
-            response = requests.post(f'{BASE_URL}/api/p2p/orders/{po_id}/upload_proforma/', 
-                                    json=proforma_data, headers=headers_finance)
+            response = session.post(f'{BASE_URL}/api/p2p/orders/{po_id}/upload_proforma/', 
+                                   json=proforma_data)
             print_response(response.status_code, response.json())
             if response.status_code == 200:
                 check_message_field(response.json(), 'Upload Proforma')
                 print('✓ Proforma invoice uploaded successfully')
-        except Exception as e:
-            print(f'✗ Error: {e}')
+        except REQUEST_ERRORS as e:
+            print_error(e)
 
     # Test 19: Update PO Status
     print_test(19, f'POST /api/p2p/orders/{po_id}/update_status/ - Update Status to Processing')
     status_data = {'status': 'processing'}
     if 'finance' in tokens:
         try:
-            response = requests.post(f'{BASE_URL}/api/p2p/orders/{po_id}/update_status/', 
-                                    json=status_data, headers=headers_finance)
+            response = session.post(f'{BASE_URL}/api/p2p/orders/{po_id}/update_status/', 
+                                   json=status_data)
             print_response(response.status_code, response.json())
             if response.status_code == 200:
                 check_message_field(response.json(), 'Update Status')
                 print('✓ Purchase order status updated successfully')
-        except Exception as e:
-            print(f'✗ Error: {e}')
+        except REQUEST_ERRORS as e:
+            print_error(e)
 
     # Test 20: Upload Receipt
     print_test(20, f'POST /api/p2p/orders/{po_id}/upload_receipt/ - Upload Receipt')
@@ -426,23 +559,59 @@ if po_id:
     }
     if 'finance' in tokens:
         try:
-            response = requests.post(f'{BASE_URL}/api/p2p/orders/{po_id}/upload_receipt/', 
-                                    json=receipt_data, headers=headers_finance)
+            response = session.post(f'{BASE_URL}/api/p2p/orders/{po_id}/upload_receipt/', 
+                                   json=receipt_data)
             print_response(response.status_code, response.json())
             if response.status_code == 200:
                 check_message_field(response.json(), 'Upload Receipt')
                 print('✓ Receipt uploaded successfully')
-        except Exception as e:
-            print(f'✗ Error: {e}')
+        except REQUEST_ERRORS as e:
+            print_error(e)
 else:
     print('\n⚠ Skipping PO tests - No purchase order ID available')
 
+if LOAD_REQUESTS:
+    print_section(f'LOAD TEST: {LOAD_REQUESTS} CONCURRENT PURCHASE REQUESTS')
+    staff_headers = {'Authorization': f'Bearer {tokens["staff"]}'}
+    
+    def timed_create():
+        started = time.perf_counter()
+        response = session.post(f'{BASE_URL}/api/p2p/requests/', data=pr_payload, headers=staff_headers)
+        return response.status_code, time.perf_counter() - started
+    
+    current_test = 'Load test'
+    started = time.perf_counter()
+    futures = run_parallel([timed_create] * LOAD_REQUESTS, max_workers=LOAD_REQUESTS)
+    elapsed = time.perf_counter() - started
+    latencies = []
+    for future in futures:
+        try:
+            status_code, latency = future.result()
+        except REQUEST_ERRORS as e:
+            print_error(e)
+            continue
+        if status_code != 201:
+            print_error(f'Create returned {status_code}')
+        latencies.append(latency)
+    
+    if latencies:
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f'{len(latencies)} requests in {elapsed:.2f}s ({len(latencies) / elapsed:.1f} req/s)')
+        print(f'p50 {p50 * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms')
+
 # ============================================================================
 # TEST SUMMARY
 # ============================================================================
 
 print_section('TEST SUMMARY')
-print("""
+if failures:
+    print(f'\n✗ {len(failures)} check(s) failed:')
+    for failure in failures:
+        print(f'  - {failure}')
+else:
+    print("""
 ✓ All 20 endpoints have been tested
 ✓ Standardized response format verified (message fields)
 ✓ Authentication and JWT token flow working
@@ -452,3 +621,7 @@ print("""
 
 The P2P backend system is fully functional with standardized responses!
 """)
+
+session.close()
+
+sys.exit(1 if failures else 0)
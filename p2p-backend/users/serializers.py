@@ -1,11 +1,18 @@
 from django.contrib.auth import get_user_model
+from collections.abc import Mapping
 from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.settings import api_settings
 from django.contrib.auth.password_validation import validate_password
 from drf_spectacular.utils import extend_schema_field
+from core.serializers import CachedFieldsMixin
 
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+# Standalone field used to format values() rows exactly like UserSerializer does
+_DATETIME_FIELD = serializers.DateTimeField()
+
+class UserSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     
     @extend_schema_field(serializers.CharField)
@@ -16,8 +23,30 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'email', 'first_name', 'last_name', 'full_name', 'role', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    # Columns read by to_representation_from_values()
+    VALUES_FIELDS = ('id', 'email', 'first_name', 'last_name', 'role', 'is_active', 'created_at', 'updated_at')
+    
+    @staticmethod
+    def to_representation_from_values(rows):
+        """Build the same payload as serializing User instances, from queryset.values(*VALUES_FIELDS) rows"""
+        to_datetime = _DATETIME_FIELD.to_representation
+        return [
+            {
+                'id': row['id'],
+                'email': row['email'],
+                'first_name': row['first_name'],
+                'last_name': row['last_name'],
+                'full_name': f"{row['first_name']} {row['last_name']}".strip(),
+                'role': row['role'],
+                'is_active': row['is_active'],
+                'created_at': to_datetime(row['created_at']),
+                'updated_at': to_datetime(row['updated_at']),
+            }
+            for row in rows
+        ]
 
-class UserRegistrationSerializer(serializers.ModelSerializer):
+class UserRegistrationSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
     password2 = serializers.CharField(write_only=True, required=True)
 
@@ -37,4 +66,21 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
 class LoginSerializer(serializers.Serializer):
     email = serializers.EmailField(required=True)
-    password = serializers.CharField(required=True, write_only=True)
\ No newline at end of file
+    password = serializers.CharField(required=True, write_only=True)
+
+# LoginSerializer's own bound fields, built once so validate_login() can run them without a serializer per request
+_LOGIN_FIELDS = LoginSerializer().fields
+
+def validate_login(data):
+    """Validate a login payload exactly like LoginSerializer; returns (validated_data, errors)"""
+    if not isinstance(data, Mapping):
+        message = serializers.Serializer.default_error_messages['invalid'].format(datatype=type(data).__name__)
+        return None, {api_settings.NON_FIELD_ERRORS_KEY: [serializers.ErrorDetail(message, code='invalid')]}
+    
+    validated_data, errors = {}, {}
+    for name, field in _LOGIN_FIELDS.items():
+        try:
+            validated_data[name] = field.run_validation(data.get(name, empty))
+        except serializers.ValidationError as exc:
+            errors[name] = exc.detail
+    return validated_data, errors
@@ -1,52 +1,169 @@
-from django.contrib.auth import get_user_model, authenticate
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 from rest_framework_simplejwt.tokens import RefreshToken
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
-from .serializers import UserSerializer, UserRegistrationSerializer, LoginSerializer
+from core.throttling import LoginEmailRateThrottle
+from .serializers import UserSerializer, UserRegistrationSerializer, LoginSerializer, validate_login
+import orjson
 
 User = get_user_model()
 
+def _json_response(payload, status_code=status.HTTP_200_OK):
+    """Encode a fixed-shape payload of plain JSON types straight to a response, skipping content negotiation"""
+    return HttpResponse(orjson.dumps(payload), content_type='application/json', status=status_code)
+
+# Failed-login body never changes, so it is encoded once at import
+_INVALID_CREDENTIALS_BODY = orjson.dumps({
+    'message': 'Invalid credentials',
+    'error': 'Email or password is incorrect'
+})
+
+def _issue_tokens(user):
+    """Refresh and access token pair for a user; the access token is derived from the refresh token's claims"""
+    refresh = RefreshToken.for_user(user)
+    return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+# Columns login reads: the password hash plus everything the response serializes
+_LOGIN_USER_FIELDS = ('password', *UserSerializer.VALUES_FIELDS)
+
+def _authenticate(email, password):
+    """ModelBackend's email/password check in one narrow query (ModelBackend is the only configured backend)"""
+    try:
+        user = User.objects.only(*_LOGIN_USER_FIELDS).get(email=email)
+    except User.DoesNotExist:
+        # Run the hasher anyway so response times do not reveal which emails are registered
+        User().set_password(password)
+        return None
+    if user.is_active and user.check_password(password):
+        return user
+    return None
+
+def _user_to_dict(user):
+    """UserSerializer(user).data for an already loaded user, without the serializer field machinery"""
+    row = {field: getattr(user, field) for field in UserSerializer.VALUES_FIELDS}
+    return UserSerializer.to_representation_from_values([row])[0]
+
+# Login/register success body; each value is JSON-encoded on its own, so quotes or
+# backslashes in a message or token are escaped rather than breaking the document
+_AUTH_SUCCESS_TEMPLATE = b'{"message":%s,"user":%s,"refresh":%s,"access":%s}'
+
+def _auth_success_response(message, user, status_code=status.HTTP_200_OK):
+    """Fill _AUTH_SUCCESS_TEMPLATE for a user, issuing a fresh token pair"""
+    tokens = _issue_tokens(user)
+    body = _AUTH_SUCCESS_TEMPLATE % (
+        orjson.dumps(message),
+        orjson.dumps(_user_to_dict(user)),
+        orjson.dumps(tokens['refresh']),
+        orjson.dumps(tokens['access']),
+    )
+    return HttpResponse(body, content_type='application/json', status=status_code)
+
 class UserViewSet(ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
+        # Only the columns UserSerializer exposes; skips the password hash, last_login and flags
+        queryset = User.objects.only(*UserSerializer.VALUES_FIELDS)
         # Users can only see themselves unless they are superuser
         if self.request.user.is_superuser:
-            return User.objects.all()
-        return User.objects.filter(id=self.request.user.id)
+            return queryset
+        return queryset.filter(id=self.request.user.id)
+    
+    def list(self, request, *args, **kwargs):
+        if not request.user.is_superuser:
+            # The only visible row is the authenticated user, which is already loaded
+            rows = [_user_to_dict(request.user)]
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                return self.get_paginated_response(page)
+            return Response(rows)
+        # Plain values() rows instead of model instances run through the serializer
+        queryset = self.filter_queryset(self.get_queryset()).values(*UserSerializer.VALUES_FIELDS)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(UserSerializer.to_representation_from_values(page))
+        # Without pagination a superuser gets every user; stream rows in chunks instead of caching them all
+        return Response(UserSerializer.to_representation_from_values(queryset.iterator(chunk_size=1000)))
+    
+    def retrieve(self, request, *args, **kwargs):
+        # Looking up yourself needs no query; request.user is already loaded
+        if str(kwargs.get(self.lookup_url_kwarg or self.lookup_field)) == str(request.user.pk):
+            return Response(_user_to_dict(request.user))
+        return super().retrieve(request, *args, **kwargs)
+
+# OpenAPI response schemas for the auth views
+_VALIDATION_ERROR_RESPONSE = {
+    'type': 'object',
+    'properties': {
+        'message': {'type': 'string'},
+        'errors': {'type': 'object'}
+    }
+}
+
+_REGISTER_RESPONSES = {
+    201: {
+        'type': 'object',
+        'properties': {
+            'message': {'type': 'string'},
+            'user': UserSerializer,
+            'refresh': {'type': 'string'},
+            'access': {'type': 'string'}
+        }
+    },
+    400: _VALIDATION_ERROR_RESPONSE
+}
+
+_LOGIN_RESPONSES = {
+    200: {
+        'type': 'object',
+        'properties': {
+            'message': {'type': 'string'},
+            'refresh': {'type': 'string', 'description': 'JWT refresh token'},
+            'access': {'type': 'string', 'description': 'JWT access token'},
+            'user': {
+                'type': 'object',
+                'properties': {
+                    'id': {'type': 'integer'},
+                    'email': {'type': 'string'},
+                    'first_name': {'type': 'string'},
+                    'last_name': {'type': 'string'},
+                    'full_name': {'type': 'string'},
+                    'role': {'type': 'string'},
+                    'is_active': {'type': 'boolean'}
+                }
+            }
+        }
+    },
+    400: _VALIDATION_ERROR_RESPONSE,
+    401: {
+        'type': 'object',
+        'properties': {
+            'message': {'type': 'string'},
+            'error': {'type': 'string'}
+        }
+    }
+}
 
 class RegisterView(APIView):
     permission_classes = [AllowAny]
     serializer_class = UserRegistrationSerializer
+    # Per-IP limit, checked before the password is hashed
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'auth'
 
     @extend_schema(
         request=UserRegistrationSerializer,
-        responses={
-            201: {
-                'type': 'object',
-                'properties': {
-                    'message': {'type': 'string'},
-                    'user': UserSerializer,
-                    'refresh': {'type': 'string'},
-                    'access': {'type': 'string'}
-                }
-            },
-            400: {
-                'type': 'object',
-                'properties': {
-                    'message': {'type': 'string'},
-                    'errors': {'type': 'object'}
-                }
-            }
-        },
+        responses=_REGISTER_RESPONSES,
         description="Register a new user with email, password, role, first_name, and last_name",
         examples=[
             OpenApiExample(
@@ -67,60 +184,22 @@ class RegisterView(APIView):
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
-            return Response({
-                'message': 'User registered successfully',
-                'user': UserSerializer(user).data,
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            }, status=status.HTTP_201_CREATED)
-        return Response({
+            return _auth_success_response('User registered successfully', user, status.HTTP_201_CREATED)
+        return _json_response({
             'message': 'Registration failed',
             'errors': serializer.errors
-        }, status=status.HTTP_400_BAD_REQUEST)
+        }, status.HTTP_400_BAD_REQUEST)
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
     serializer_class = LoginSerializer
+    # Per-IP and per-account limits, checked before the password hash is verified
+    throttle_classes = [ScopedRateThrottle, LoginEmailRateThrottle]
+    throttle_scope = 'auth'
 
     @extend_schema(
         request=LoginSerializer,
-        responses={
-            200: {
-                'type': 'object',
-                'properties': {
-                    'message': {'type': 'string'},
-                    'refresh': {'type': 'string', 'description': 'JWT refresh token'},
-                    'access': {'type': 'string', 'description': 'JWT access token'},
-                    'user': {
-                        'type': 'object',
-                        'properties': {
-                            'id': {'type': 'integer'},
-                            'email': {'type': 'string'},
-                            'first_name': {'type': 'string'},
-                            'last_name': {'type': 'string'},
-                            'full_name': {'type': 'string'},
-                            'role': {'type': 'string'},
-                            'is_active': {'type': 'boolean'}
-                        }
-                    }
-                }
-            },
-            400: {
-                'type': 'object',
-                'properties': {
-                    'message': {'type': 'string'},
-                    'errors': {'type': 'object'}
-                }
-            },
-            401: {
-                'type': 'object',
-                'properties': {
-                    'message': {'type': 'string'},
-                    'error': {'type': 'string'}
-                }
-            }
-        },
+        responses=_LOGIN_RESPONSES,
         description="Login with email and password to get JWT tokens",
         examples=[
             OpenApiExample(
@@ -134,28 +213,23 @@ class LoginView(APIView):
         ]
     )
     def post(self, request):
-        serializer = LoginSerializer(data=request.data)
-        if serializer.is_valid():
-            email = serializer.validated_data['email']
-            password = serializer.validated_data['password']
-            user = authenticate(request, username=email, password=password)
+        validated_data, errors = validate_login(request.data)
+        if not errors:
+            email = validated_data['email']
+            password = validated_data['password']
+            user = _authenticate(email, password)
             
             if user is not None:
-                refresh = RefreshToken.for_user(user)
-                return Response({
-                    'message': 'Login successful',
-                    'user': UserSerializer(user).data,
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }, status=status.HTTP_200_OK)
-            return Response({
-                'message': 'Invalid credentials',
-                'error': 'Email or password is incorrect'
-            }, status=status.HTTP_401_UNAUTHORIZED)
-        return Response({
+                return _auth_success_response('Login successful', user)
+            return HttpResponse(
+                _INVALID_CREDENTIALS_BODY,
+                content_type='application/json',
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        return _json_response({
             'message': 'Validation failed',
-            'errors': serializer.errors
-        }, status=status.HTTP_400_BAD_REQUEST)
+            'errors': errors
+        }, status.HTTP_400_BAD_REQUEST)
 
 @extend_schema(
     responses={200: UserSerializer},
@@ -164,5 +238,4 @@ class LoginView(APIView):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def current_user(request):
-    serializer = UserSerializer(request.user)
-    return Response(serializer.data)
\ No newline at end of file
+    return _json_response(_user_to_dict(request.user))
\ No newline at end of file